@@ -0,0 +1,12 @@
+# Dashboard events go onto the 'events' Redis stream rather than Pub/Sub. Every
+# API process tails it with plain XREAD (no consumer group: each process needs
+# every event for its own WebSocket clients) and, after a dropped connection,
+# resumes from the last entry ID it saw, so a reconnect no longer loses events.
+# Only the newest ~EVENT_STREAM_MAXLEN entries are kept.
+EVENT_STREAM = "events"
+EVENT_STREAM_MAXLEN = 10_000
+
+
+def add_event(conn, payload):
+    """XADD one encoded event. `conn` may be a client or a pipeline, sync or async."""
+    return conn.xadd(EVENT_STREAM, {"p": payload}, maxlen=EVENT_STREAM_MAXLEN, approximate=True)
@@ -0,0 +1,124 @@
+"""
+API Response Caches
+===================
+Short-lived caches for read-mostly API payloads that the dashboard polls every
+few seconds: TTLCache is per-process, RedisCache is shared across workers.
+
+Cache serialized snapshots (Pydantic models), never live ORM objects: those are
+bound to the request's Session and go stale/detached once it closes.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+import anyio
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+
+
+class TTLCache:
+    """Per-process cache with a TTL per entry, bounded to `maxsize` keys (least recently used evicted)."""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = loader()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class RedisCache:
+    """
+    Cache-aside for whole GET responses, shared by every API worker.
+
+    `cached(name)` wraps a sync endpoint: a hit is returned straight from Redis,
+    a miss runs the endpoint in the threadpool and stores its JSON for `ttl`
+    seconds. Endpoint arguments other than the `db` session are part of the key,
+    so each distinct call is cached separately. Wrapped endpoints must return
+    JSON-able data (dicts or Pydantic models) or an already-encoded JSON body as
+    bytes, since the stored body bypasses response_model filtering.
+    """
+
+    # Injected dependencies that don't change what an endpoint returns
+    UNKEYED_ARGS = frozenset({"db"})
+
+    def __init__(self, redis_client, ttl: int, prefix: str):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.prefix = prefix
+        self._names = set()
+        self._keyed_names = set()
+
+    def cached(self, name: str):
+        base_key = self.prefix + name
+        self._names.add(name)
+
+        def decorator(fn):
+            signature = inspect.signature(fn)
+            keyed = [p for p in signature.parameters if p not in self.UNKEYED_ARGS]
+            if keyed:
+                self._keyed_names.add(name)
+
+            def cache_key(args, kwargs) -> str:
+                if not keyed:
+                    return base_key
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key_args = {p: bound.arguments[p] for p in keyed}
+                return base_key + ":" + orjson.dumps(key_args, default=str).decode()
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                key = cache_key(args, kwargs)
+                body = await self.redis.get(key)
+                if body is None:
+                    result = await run_in_threadpool(fn, *args, **kwargs)
+                    if isinstance(result, bytes):
+                        body = result
+                    else:
+                        # orjson encodes dicts, lists and datetimes itself; jsonable_encoder
+                        # only sees what it can't (Pydantic models and the like)
+                        body = orjson.dumps(result, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+                    await self.redis.set(key, body, ex=self.ttl)
+                return Response(body, media_type="application/json")
+            return wrapper
+        return decorator
+
+    async def ainvalidate(self):
+        keys = [self.prefix + n for n in self._names]
+        for name in self._keyed_names:
+            keys += [k async for k in self.redis.scan_iter(match=self.prefix + name + ":*")]
+        if keys:
+            await self.redis.delete(*keys)
+
+    def invalidate(self):
+        """For sync endpoints: they run in a worker thread, so hop back onto the loop."""
+        anyio.from_thread.run(self.ainvalidate)
@@ -12,13 +12,15 @@ Supports:
 """
 
 import json
-import uuid
 import time
 import redis
+import orjson
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 
 from enterprise_core.app import crud, schemas
+from common.events import add_event
+from common.ids import next_task_id
 
 
 class AgentCommunicationBus:
@@ -34,7 +36,6 @@ class AgentCommunicationBus:
 
     def __init__(self, redis_url: str = "redis://redis:6379/0"):
         self.redis_conn = redis.Redis.from_url(redis_url, decode_responses=True)
-        self.event_channel = "events"
         print("[CommBus] Agent Communication Bus initialized.")
 
     # ------------------------------------------------------------------
@@ -56,7 +57,7 @@ class AgentCommunicationBus:
         Pushes to the receiver's Redis inbox and persists to DB.
         Returns the message_id.
         """
-        message_id = str(uuid.uuid4())
+        message_id = next_task_id()
         if not session_id:
             session_id = task_id  # Default session to task scope
 
@@ -84,8 +85,8 @@ class AgentCommunicationBus:
             sender_agent=sender_agent,
             receiver_agent=receiver_agent,
             message_type=message_type,
-            content=json.dumps(content),
-            metadata_json=json.dumps(metadata) if metadata else None,
+            content=content,
+            metadata_json=metadata or None,
         )
         crud.create_agent_message(db, db_msg)
 
@@ -203,7 +204,7 @@ class AgentCommunicationBus:
         task_id: str,
     ) -> str:
         """Broadcast a message to all agents via the broadcast channel."""
-        message_id = str(uuid.uuid4())
+        message_id = next_task_id()
         message = {
             "message_id": message_id,
             "sender_agent": sender_agent,
@@ -288,10 +289,11 @@ class AgentCommunicationBus:
                 self.redis_conn.setex(result_key, 300, json.dumps(msg))
                 return msg
             elif msg:
-                # Not the message we want, put it back
+                # Not the message we want, put it back and back off so we don't
+                # spin popping/re-pushing it. An empty BLPOP already waited.
                 inbox_key = f"agent:{agent_name}:inbox"
                 self.redis_conn.rpush(inbox_key, json.dumps(msg))
-            time.sleep(0.1)
+                time.sleep(0.1)
         
         return None
 
@@ -304,7 +306,7 @@ class AgentCommunicationBus:
             "timestamp": time.time(),
             **data,
         }
-        self.redis_conn.publish(self.event_channel, json.dumps(event))
+        add_event(self.redis_conn, orjson.dumps(event))
 
 
 # Singleton instance
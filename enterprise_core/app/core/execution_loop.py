@@ -14,20 +14,44 @@ The loop continues until:
 - An unrecoverable error occurs
 """
 
+import functools
 import json
 import time
-import uuid
 from typing import Dict, Any, Optional, List
 
 from sqlalchemy.orm import Session
 
 from enterprise_core.app import crud, schemas
 from enterprise_core.app.core.persona import get_persona, Persona, ToolDefinition
-from enterprise_core.app.services.llm import llm_client
+from enterprise_core.app.services.llm import get_llm_client
+from common.events import add_event
+from common.ids import next_task_id
 from common.tools import tool_registry
+import orjson
 import redis
 
 
+@functools.lru_cache(maxsize=256)
+def _tool_definitions(tool_names: tuple) -> Dict[str, ToolDefinition]:
+    """
+    Persona-side tool definitions for a persona's tool list. Tools are all
+    registered at import, so the result is built once per distinct list; callers
+    share the returned dict and must not modify it.
+    """
+    tool_defs = {}
+    for tool_name in tool_names:
+        try:
+            reg_tool = tool_registry.get_tool_definition(tool_name)
+            tool_defs[tool_name] = ToolDefinition(
+                name=reg_tool.name,
+                description=reg_tool.description,
+                parameters=reg_tool.parameters,
+            )
+        except ValueError:
+            pass  # Tool not registered, skip
+    return tool_defs
+
+
 class ExecutionStep:
     """Represents one step in the ReAct execution loop."""
 
@@ -72,7 +96,6 @@ class AgenticExecutionLoop:
 
     def __init__(self, redis_url: str = "redis://redis:6379/0"):
         self.redis_conn = redis.Redis.from_url(redis_url, decode_responses=True)
-        self.event_channel = "events"
         print("[ExecLoop] Agentic Execution Loop initialized.")
 
     def execute(
@@ -163,7 +186,7 @@ class AgenticExecutionLoop:
             if context:
                 prompt += f"\n\nAdditional context from orchestrator:\n{json.dumps(context, indent=2)}"
 
-            llm_response = llm_client.generate_decision(prompt)
+            llm_response = get_llm_client().generate_decision(prompt)
             model_used = llm_response.get("_provider", "mock")
             total_tokens += llm_response.get("_tokens", 0)
             total_cost += llm_response.get("_cost", 0.0)
@@ -211,13 +234,13 @@ class AgenticExecutionLoop:
                 })
 
                 # Execute sub-task inline (recursive call)
-                sub_task_id = str(uuid.uuid4())
+                sub_task_id = next_task_id()
                 sub_log = schemas.TaskLogCreate(
                     task_id=sub_task_id,
                     agent_name=delegate_to,
                     business_unit=tenant_id,
                     status="QUEUED",
-                    request_payload=json.dumps({"task": delegate_task, "source": "delegation"}),
+                    request_payload=orjson.dumps({"task": delegate_task, "source": "delegation"}).decode(),
                     parent_task_id=task_id,
                     depth=(crud.get_task_log_by_id(db, task_id).depth + 1) if crud.get_task_log_by_id(db, task_id) else 1,
                     delegated_by=persona_name,
@@ -238,7 +261,7 @@ class AgenticExecutionLoop:
                 # Update sub-task log
                 sub_update = schemas.TaskLogUpdate(
                     status=sub_result.get("status", "success"),
-                    response_payload=json.dumps(sub_result),
+                    response_payload=orjson.dumps(sub_result, option=orjson.OPT_NON_STR_KEYS).decode(),
                     duration_ms=sub_result.get("total_duration_ms", 0),
                     primary_model_used=sub_result.get("model_used", ""),
                     token_usage=sub_result.get("token_usage", 0),
@@ -323,18 +346,7 @@ class AgenticExecutionLoop:
     # ------------------------------------------------------------------
     def _build_tool_definitions(self, persona: Persona) -> Dict[str, ToolDefinition]:
         """Build tool definitions dict from the persona's tool list."""
-        tool_defs = {}
-        for tool_name in persona.tools:
-            try:
-                reg_tool = tool_registry.get_tool_definition(tool_name)
-                tool_defs[tool_name] = ToolDefinition(
-                    name=reg_tool.name,
-                    description=reg_tool.description,
-                    parameters=reg_tool.parameters,
-                )
-            except ValueError:
-                pass  # Tool not registered, skip
-        return tool_defs
+        return _tool_definitions(tuple(persona.tools))
 
     def _error_result(self, error_msg: str) -> Dict[str, Any]:
         return {
@@ -355,7 +367,7 @@ class AgenticExecutionLoop:
             "timestamp": time.time(),
             **data,
         }
-        self.redis_conn.publish(self.event_channel, json.dumps(event))
+        add_event(self.redis_conn, orjson.dumps(event))
         print(f"[ExecLoop] {event_type}: task_id={data.get('task_id', 'N/A')}")
 
 
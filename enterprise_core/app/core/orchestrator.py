@@ -13,9 +13,7 @@ Flow:
 6. Return unified result
 """
 
-import json
 import time
-import uuid
 from typing import Dict, Any, Optional, List
 
 from sqlalchemy.orm import Session
@@ -24,7 +22,10 @@ from enterprise_core.app import crud, schemas
 from enterprise_core.app.core.persona import get_persona, get_all_personas
 from enterprise_core.app.core.execution_loop import execution_loop
 from enterprise_core.app.core.communication import comm_bus
-from enterprise_core.app.services.llm import llm_client
+from enterprise_core.app.services.llm import get_llm_client
+from common.events import add_event
+from common.ids import next_task_id
+import orjson
 import redis
 
 
@@ -42,7 +43,6 @@ class TaskOrchestrator:
 
     def __init__(self, redis_url: str = "redis://redis:6379/0"):
         self.redis_conn = redis.Redis.from_url(redis_url, decode_responses=True)
-        self.event_channel = "events"
         print("[Orchestrator] Task Orchestrator initialized.")
 
     def process_task(
@@ -126,7 +126,7 @@ class TaskOrchestrator:
         })
 
         # Ask LLM to decompose
-        decomposition = llm_client.decompose_task(task_description, agent_names)
+        decomposition = get_llm_client().decompose_task(task_description, agent_names)
 
         is_complex = decomposition.get("is_complex", False)
         reasoning = decomposition.get("reasoning", "")
@@ -226,7 +226,7 @@ class TaskOrchestrator:
             sub_task_desc = sub_task_spec.get("sub_task_description", "")
             target_agent = sub_task_spec.get("target_agent", "General Assistant")
             priority = sub_task_spec.get("priority", i + 1)
-            sub_task_id = str(uuid.uuid4())
+            sub_task_id = next_task_id()
 
             self._emit_event("ORCHESTRATOR_SUB_TASK_STARTED", {
                 "task_id": task_id,
@@ -245,11 +245,11 @@ class TaskOrchestrator:
                 agent_name=target_agent,
                 business_unit=tenant_id,
                 status="QUEUED",
-                request_payload=json.dumps({
+                request_payload=orjson.dumps({
                     "task": sub_task_desc,
                     "source": "orchestrator",
                     "parent_task_id": task_id,
-                }),
+                }).decode(),
                 parent_task_id=task_id,
                 depth=parent_depth + 1,
                 delegated_by="Orchestrator",
@@ -279,7 +279,7 @@ class TaskOrchestrator:
             # Update sub-task log
             sub_update = schemas.TaskLogUpdate(
                 status=sub_result.get("status", "success"),
-                response_payload=json.dumps(sub_result),
+                response_payload=orjson.dumps(sub_result, option=orjson.OPT_NON_STR_KEYS).decode(),
                 duration_ms=sub_result.get("total_duration_ms", 0),
                 primary_model_used=sub_result.get("model_used", ""),
                 token_usage=sub_result.get("token_usage", 0),
@@ -334,7 +334,7 @@ class TaskOrchestrator:
         })
 
         # Summarize all sub-task results
-        summary = llm_client.summarize_results(task_description, sub_task_results)
+        summary = get_llm_client().summarize_results(task_description, sub_task_results)
         total_tokens += 100  # Rough estimate for summarization
 
         overall_status = "success" if all(
@@ -362,7 +362,7 @@ class TaskOrchestrator:
             "timestamp": time.time(),
             **data,
         }
-        self.redis_conn.publish(self.event_channel, json.dumps(event))
+        add_event(self.redis_conn, orjson.dumps(event))
         print(f"[Orchestrator] {event_type}: task_id={data.get('task_id', 'N/A')}")
 
 
@@ -69,7 +69,7 @@ You must respond with a JSON object strictly following this schema:
         """Build the full system prompt for the LLM."""
         # Resolve tool definitions
         available_tools = [tool_registry[t] for t in self.tools if t in tool_registry]
-        tool_desc_str = json.dumps([t.dict() for t in available_tools], indent=2)
+        tool_desc_str = json.dumps([t.model_dump() for t in available_tools], indent=2)
 
         # Build delegation instructions if applicable
         delegation_instructions = ""
@@ -1,9 +1,9 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy import String, bindparam, case, cast, func, insert, literal, literal_column, select, union_all, update
 from . import models, schemas
 import datetime
-import random
-import json
 from datetime import timedelta
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -14,7 +14,7 @@ def get_tool_by_name(db: Session, name: str):
     return db.query(models.Tool).filter(models.Tool.name == name).first()
 
 def get_all_tools(db: Session):
-    return db.query(models.Tool).all()
+    return db.query(models.Tool).options(raiseload("*")).all()
 
 def create_tool(db: Session, tool: schemas.ToolCreate):
     db_tool = models.Tool(
@@ -30,7 +30,7 @@ def create_tool(db: Session, tool: schemas.ToolCreate):
 def update_tool(db: Session, tool_id: int, update_data: schemas.ToolUpdate):
     db_tool = db.query(models.Tool).filter(models.Tool.id == tool_id).first()
     if db_tool:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_tool, key, value)
         db.commit()
         db.refresh(db_tool)
@@ -51,7 +51,7 @@ def get_skill_by_name(db: Session, name: str):
     return db.query(models.Skill).filter(models.Skill.name == name).first()
 
 def get_all_skills(db: Session):
-    return db.query(models.Skill).all()
+    return db.query(models.Skill).options(selectinload(models.Skill.agents), raiseload("*")).all()
 
 def create_skill(db: Session, skill: schemas.SkillCreate):
     db_skill = models.Skill(
@@ -67,7 +67,7 @@ def create_skill(db: Session, skill: schemas.SkillCreate):
 def update_skill(db: Session, skill_id: int, update_data: schemas.SkillUpdate):
     db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
     if db_skill:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_skill, key, value)
         db.commit()
         db.refresh(db_skill)
@@ -88,7 +88,7 @@ def get_group_by_name(db: Session, name: str):
     return db.query(models.AgentGroup).filter(models.AgentGroup.name == name).first()
 
 def get_all_groups(db: Session):
-    return db.query(models.AgentGroup).all()
+    return db.query(models.AgentGroup).options(selectinload(models.AgentGroup.members), raiseload("*")).all()
 
 def create_group(db: Session, group: schemas.AgentGroupCreate):
     db_group = models.AgentGroup(name=group.name, description=group.description, color=group.color)
@@ -100,7 +100,7 @@ def create_group(db: Session, group: schemas.AgentGroupCreate):
 def update_group(db: Session, group_id: int, update_data: schemas.AgentGroupUpdate):
     db_group = db.query(models.AgentGroup).filter(models.AgentGroup.id == group_id).first()
     if db_group:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_group, key, value)
         db.commit()
         db.refresh(db_group)
@@ -137,20 +137,21 @@ def get_agent_by_name(db: Session, name: str):
     return db.query(models.Agent).filter(models.Agent.name == name).first()
 
 def get_agents(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Agent).offset(skip).limit(limit).all()
+    # List loaders name every relationship the endpoint serializes; raiseload("*")
+    # turns any other access into an error instead of a silent per-row query
+    return db.query(models.Agent).options(
+        selectinload(models.Agent.tools), selectinload(models.Agent.skills), raiseload("*")
+    ).offset(skip).limit(limit).all()
 
 def create_agent(db: Session, agent: schemas.AgentCreate):
     db_agent = models.Agent(name=agent.name, description=agent.description)
-    # Assign tools
-    for tool_name in agent.tool_names:
-        tool = get_tool_by_name(db, name=tool_name)
-        if tool:
-            db_agent.tools.append(tool)
-    # Assign skills
-    for skill_name in agent.skill_names:
-        skill = get_skill_by_name(db, name=skill_name)
-        if skill:
-            db_agent.skills.append(skill)
+    # Assign tools and skills: one IN (...) query each, keeping the requested order
+    if agent.tool_names:
+        tools = {t.name: t for t in db.query(models.Tool).filter(models.Tool.name.in_(agent.tool_names))}
+        db_agent.tools = [tools[n] for n in agent.tool_names if n in tools]
+    if agent.skill_names:
+        skills = {s.name: s for s in db.query(models.Skill).filter(models.Skill.name.in_(agent.skill_names))}
+        db_agent.skills = [skills[n] for n in agent.skill_names if n in skills]
     # Assign group
     if agent.group_name:
         group = get_group_by_name(db, agent.group_name)
@@ -173,8 +174,9 @@ def assign_skills_to_agent(db: Session, agent_name: str, skill_names: list):
     db_agent = get_agent_by_name(db, agent_name)
     if not db_agent:
         return None
+    skills = {s.name: s for s in db.query(models.Skill).filter(models.Skill.name.in_(skill_names))}
     for skill_name in skill_names:
-        skill = get_skill_by_name(db, skill_name)
+        skill = skills.get(skill_name)
         if skill and skill not in db_agent.skills:
             db_agent.skills.append(skill)
     db.commit()
@@ -196,17 +198,36 @@ def remove_skill_from_agent(db: Session, agent_name: str, skill_name: str):
 # TASK LOG CRUD
 # ═══════════════════════════════════════════════════════════════════════
 
+def _task_pk(task_id: str):
+    """Scalar subquery resolving an external task_id to the task_logs primary key."""
+    return select(models.TaskLog.id).where(models.TaskLog.task_id == task_id).scalar_subquery()
+
 def create_task_log(db: Session, log: schemas.TaskLogCreate):
-    db_log = models.TaskLog(**log.dict())
+    db_log = models.TaskLog(**log.model_dump())
+    if log.parent_task_id:
+        db_log.parent_id = _task_pk(log.parent_task_id)  # resolved inside the INSERT
     db.add(db_log)
     db.commit()
     db.refresh(db_log)
     return db_log
 
+def create_task_logs_bulk(db: Session, logs: List[schemas.TaskLogCreate]):
+    # Core INSERT with a parameter list: one executemany (psycopg pipelines it), no RETURNING or refresh
+    rows = [log.model_dump() for log in logs]
+    parent_task_ids = {row["parent_task_id"] for row in rows if row["parent_task_id"]}
+    if parent_task_ids:
+        parent_ids = dict(db.query(models.TaskLog.task_id, models.TaskLog.id).filter(
+            models.TaskLog.task_id.in_(parent_task_ids)
+        ).all())
+        for row in rows:
+            row["parent_id"] = parent_ids.get(row["parent_task_id"])
+    db.execute(insert(models.TaskLog), rows)
+    db.commit()
+
 def update_task_log(db: Session, task_id: str, update_data: schemas.TaskLogUpdate):
     db_log = db.query(models.TaskLog).filter(models.TaskLog.task_id == task_id).first()
     if db_log:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_log, key, value)
         db_log.end_time = datetime.datetime.utcnow()
         db.commit()
@@ -216,39 +237,85 @@ def update_task_log(db: Session, task_id: str, update_data: schemas.TaskLogUpdat
 def get_task_logs(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.TaskLog).order_by(models.TaskLog.start_time.desc()).offset(skip).limit(limit).all()
 
+def _fulltext_match(db: Session, table: str, document, query: str):
+    """
+    Filter for rows whose text matches `query`: the GIN-indexed search_vector
+    column init_db adds on Postgres, a LIKE scan of `document` elsewhere.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return literal_column(f"{table}.search_vector").op("@@")(func.plainto_tsquery("english", query))
+    return document.ilike(f"%{query}%")
+
+def search_task_logs(db: Session, query: str, limit: int = 100):
+    return db.query(models.TaskLog).filter(
+        _fulltext_match(db, "task_logs", models.TaskLog.request_payload, query)
+    ).order_by(models.TaskLog.start_time.desc()).limit(limit).all()
+
+def get_task_logs_for_session(db: Session, session_id: str, limit: int = 500):
+    return db.query(models.TaskLog).filter(
+        models.TaskLog.session_id == session_id
+    ).order_by(models.TaskLog.start_time.desc()).limit(limit).all()
+
 def get_task_log_by_id(db: Session, task_id: str):
     return db.query(models.TaskLog).filter(models.TaskLog.task_id == task_id).first()
 
+def get_task_log_with_details(db: Session, task_id: str):
+    """Task log plus its agent state (same query), and its reasoning steps and sub-tasks (one IN query each)."""
+    return db.query(models.TaskLog).options(
+        joinedload(models.TaskLog.agent_state).selectinload(models.AgentState.reasoning_steps),
+        selectinload(models.TaskLog.sub_tasks),
+    ).filter(models.TaskLog.task_id == task_id).first()
+
 def get_sub_tasks(db: Session, parent_task_id: str):
     return db.query(models.TaskLog).filter(
-        models.TaskLog.parent_task_id == parent_task_id
+        models.TaskLog.parent_id == _task_pk(parent_task_id)
     ).order_by(models.TaskLog.start_time.asc()).all()
 
+def _build_task_tree_stmt():
+    # Walks the whole sub-task hierarchy server-side in one round trip.
+    task_logs = models.TaskLog.__table__
+    columns = ("id", "parent_id", "task_id", "agent_name", "status", "depth",
+               "delegated_by", "duration_ms", "start_time")
+    tree = select(*[task_logs.c[c] for c in columns]).where(
+        task_logs.c.task_id == bindparam("root_task_id")
+    ).cte("task_tree", recursive=True)
+    child = task_logs.alias("child")
+    tree = tree.union_all(
+        select(*[child.c[c] for c in columns]).where(child.c.parent_id == tree.c.id)
+    )
+    return select(tree).order_by(tree.c.start_time.asc())
+
+_TASK_TREE_STMT = _build_task_tree_stmt()
+
 def get_task_tree(db: Session, root_task_id: str):
-    root = get_task_log_by_id(db, root_task_id)
-    if not root:
+    rows = db.execute(_TASK_TREE_STMT, {"root_task_id": root_task_id}).mappings().all()
+    if not rows:
         return None
 
-    def _build_tree(task):
-        children = get_sub_tasks(db, task.task_id)
-        return {
-            "task_id": task.task_id,
-            "agent_name": task.agent_name,
-            "status": task.status,
-            "depth": task.depth,
-            "delegated_by": task.delegated_by,
-            "duration_ms": task.duration_ms,
-            "sub_tasks": [_build_tree(c) for c in children]
+    nodes = {
+        row["id"]: {
+            "task_id": row["task_id"],
+            "agent_name": row["agent_name"],
+            "status": row["status"],
+            "depth": row["depth"],
+            "delegated_by": row["delegated_by"],
+            "duration_ms": row["duration_ms"],
+            "sub_tasks": [],
         }
-
-    return _build_tree(root)
+        for row in rows
+    }
+    root = next(nodes[row["id"]] for row in rows if row["task_id"] == root_task_id)
+    for row in rows:
+        if row["task_id"] != root_task_id and row["parent_id"] in nodes:
+            nodes[row["parent_id"]]["sub_tasks"].append(nodes[row["id"]])
+    return root
 
 # ═══════════════════════════════════════════════════════════════════════
 # SCHEDULED TASK CRUD
 # ═══════════════════════════════════════════════════════════════════════
 
 def create_scheduled_task(db: Session, task: schemas.ScheduledTaskCreate):
-    db_task = models.ScheduledTask(**task.dict())
+    db_task = models.ScheduledTask(**task.model_dump())
     # Set next_run_at based on scheduled_at or now
     if task.scheduled_at:
         db_task.next_run_at = task.scheduled_at
@@ -258,7 +325,8 @@ def create_scheduled_task(db: Session, task: schemas.ScheduledTaskCreate):
     return db_task
 
 def get_all_scheduled_tasks(db: Session):
-    return db.query(models.ScheduledTask).order_by(models.ScheduledTask.created_at.desc()).all()
+    # Plain rows (no ORM identity map), shaped exactly like the API response
+    return db.query(*models.ScheduledTask.__table__.columns).order_by(models.ScheduledTask.created_at.desc()).all()
 
 def get_scheduled_task_by_id(db: Session, task_id: int):
     return db.query(models.ScheduledTask).filter(models.ScheduledTask.id == task_id).first()
@@ -266,7 +334,7 @@ def get_scheduled_task_by_id(db: Session, task_id: int):
 def update_scheduled_task(db: Session, task_id: int, update_data: schemas.ScheduledTaskUpdate):
     db_task = db.query(models.ScheduledTask).filter(models.ScheduledTask.id == task_id).first()
     if db_task:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_task, key, value)
         db.commit()
         db.refresh(db_task)
@@ -316,7 +384,9 @@ def create_workflow(db: Session, workflow: schemas.WorkflowCreate):
     return db_wf
 
 def get_all_workflows(db: Session):
-    return db.query(models.Workflow).order_by(models.Workflow.created_at.desc()).all()
+    return db.query(models.Workflow).options(
+        selectinload(models.Workflow.steps), raiseload("*")
+    ).order_by(models.Workflow.created_at.desc()).all()
 
 def get_workflow_by_id(db: Session, workflow_id: int):
     return db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
@@ -327,7 +397,7 @@ def get_workflow_by_name(db: Session, name: str):
 def update_workflow(db: Session, workflow_id: int, update_data: schemas.WorkflowUpdate):
     db_wf = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
     if db_wf:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_wf, key, value)
         db_wf.updated_at = datetime.datetime.utcnow()
         db.commit()
@@ -361,7 +431,7 @@ def add_workflow_step(db: Session, workflow_id: int, step: schemas.WorkflowStepC
 def update_workflow_step(db: Session, step_id: int, update_data: schemas.WorkflowStepUpdate):
     db_step = db.query(models.WorkflowStep).filter(models.WorkflowStep.id == step_id).first()
     if db_step:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_step, key, value)
         db.commit()
         db.refresh(db_step)
@@ -379,31 +449,35 @@ def delete_workflow_step(db: Session, step_id: int):
 # ═══════════════════════════════════════════════════════════════════════
 
 def create_knowledge(db: Session, knowledge: schemas.AgentKnowledgeCreate):
-    db_k = models.AgentKnowledge(**knowledge.dict())
+    db_k = models.AgentKnowledge(**knowledge.model_dump())
     db.add(db_k)
     db.commit()
     db.refresh(db_k)
     return db_k
 
 def get_knowledge_for_agent(db: Session, agent_name: str, limit: int = 50):
-    return db.query(models.AgentKnowledge).filter(
+    return db.query(*models.AgentKnowledge.__table__.columns).filter(
         models.AgentKnowledge.agent_name == agent_name
     ).order_by(models.AgentKnowledge.created_at.desc()).limit(limit).all()
 
 def search_knowledge(db: Session, agent_name: str, query: str, limit: int = 20):
-    return db.query(models.AgentKnowledge).filter(
+    return db.query(*models.AgentKnowledge.__table__.columns).filter(
         models.AgentKnowledge.agent_name == agent_name,
         models.AgentKnowledge.topic.ilike(f"%{query}%")
     ).order_by(models.AgentKnowledge.usage_count.desc()).limit(limit).all()
 
-def increment_knowledge_usage(db: Session, knowledge_id: int):
-    db_k = db.query(models.AgentKnowledge).filter(models.AgentKnowledge.id == knowledge_id).first()
-    if db_k:
-        db_k.usage_count += 1
-        db_k.last_used_at = datetime.datetime.utcnow()
-        db.commit()
-        db.refresh(db_k)
-    return db_k
+def increment_knowledge_usage(db: Session, knowledge_ids: Iterable[int]) -> int:
+    """Count one recall for each entry in a single UPDATE, however many were recalled."""
+    ids = set(knowledge_ids)
+    if not ids:
+        return 0
+    result = db.execute(
+        update(models.AgentKnowledge)
+        .where(models.AgentKnowledge.id.in_(ids))
+        .values(usage_count=models.AgentKnowledge.usage_count + 1, last_used_at=datetime.datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount
 
 def get_top_knowledge(db: Session, agent_name: str, limit: int = 10):
     return db.query(models.AgentKnowledge).filter(
@@ -422,22 +496,33 @@ def delete_knowledge(db: Session, knowledge_id: int):
 # ═══════════════════════════════════════════════════════════════════════
 
 def create_agent_message(db: Session, msg: schemas.AgentMessageCreate):
-    db_msg = models.AgentMessage(**msg.dict())
+    # No refresh: the bus never reads the row back, so skip the extra SELECT
+    db_msg = models.AgentMessage(**msg.model_dump())
     db.add(db_msg)
     db.commit()
-    db.refresh(db_msg)
     return db_msg
 
+def create_agent_messages_bulk(db: Session, msgs: List[schemas.AgentMessageCreate]):
+    # Core INSERT with a parameter list: one executemany (psycopg pipelines it), no RETURNING or refresh
+    db.execute(insert(models.AgentMessage), [m.model_dump() for m in msgs])
+    db.commit()
+
 def get_messages_for_agent(db: Session, agent_name: str, limit: int = 50):
     return db.query(models.AgentMessage).filter(
         models.AgentMessage.receiver_agent == agent_name,
         models.AgentMessage.status == "pending"
     ).order_by(models.AgentMessage.timestamp.asc()).limit(limit).all()
 
-def get_messages_for_task(db: Session, task_id: str):
-    return db.query(models.AgentMessage).filter(
-        models.AgentMessage.task_id == task_id
-    ).order_by(models.AgentMessage.timestamp.asc()).all()
+def get_messages_for_task(db: Session, task_id: str, batch_size: int = 500):
+    # Read-only listing: plain rows of just the displayed columns, no ORM identity tracking
+    # Labels match the API field names, so rows serialize as-is
+    # Returned unexecuted with yield_per: iterating fetches `batch_size` rows at a
+    # time (server-side cursor on Postgres) instead of buffering the whole task
+    m = models.AgentMessage
+    return db.query(
+        m.message_id, m.sender_agent.label("sender"), m.receiver_agent.label("receiver"),
+        m.message_type.label("type"), m.content, m.status, m.timestamp,
+    ).filter(m.task_id == task_id).order_by(m.timestamp.asc()).yield_per(batch_size)
 
 def update_message_status(db: Session, message_id: str, status: str):
     db_msg = db.query(models.AgentMessage).filter(
@@ -454,7 +539,7 @@ def update_message_status(db: Session, message_id: str, status: str):
 # ═══════════════════════════════════════════════════════════════════════
 
 def create_agent_state(db: Session, state: schemas.AgentStateCreate):
-    db_state = models.AgentState(**state.dict())
+    db_state = models.AgentState(**state.model_dump())
     db.add(db_state)
     db.commit()
     db.refresh(db_state)
@@ -465,12 +550,18 @@ def get_agent_state(db: Session, task_id: str):
         models.AgentState.task_id == task_id
     ).first()
 
+def get_active_agent_states(db: Session):
+    s = models.AgentState
+    return db.query(
+        s.task_id, s.agent_name, s.current_step, s.max_steps, s.status, s.updated_at
+    ).filter(s.status.notin_(models.AgentState.FINISHED_STATUSES)).all()
+
 def update_agent_state(db: Session, task_id: str, update_data: schemas.AgentStateUpdate):
     db_state = db.query(models.AgentState).filter(
         models.AgentState.task_id == task_id
     ).first()
     if db_state:
-        for key, value in update_data.dict(exclude_unset=True).items():
+        for key, value in update_data.model_dump(exclude_unset=True).items():
             setattr(db_state, key, value)
         db_state.updated_at = datetime.datetime.utcnow()
         db.commit()
@@ -478,56 +569,84 @@ def update_agent_state(db: Session, task_id: str, update_data: schemas.AgentStat
     return db_state
 
 def append_reasoning_step(db: Session, task_id: str, step: dict):
-    db_state = get_agent_state(db, task_id)
-    if db_state:
-        trace = json.loads(db_state.reasoning_trace or "[]")
-        trace.append(step)
-        db_state.reasoning_trace = json.dumps(trace)
-        db_state.current_step = len(trace)
-        db_state.updated_at = datetime.datetime.utcnow()
-        db.commit()
-        db.refresh(db_state)
-    return db_state
+    # One INSERT per step (not a rewrite of the whole trace), plus a bump of the
+    # state's step counter for cheap progress polls, in one transaction
+    db_step = models.ReasoningStep(
+        task_id=task_id, step_index=step["step"], kind=step.get("action"), content=step,
+    )
+    db.add(db_step)
+    db.query(models.AgentState).filter(models.AgentState.task_id == task_id).update(
+        {"current_step": step["step"], "updated_at": datetime.datetime.utcnow()},
+        synchronize_session=False,
+    )
+    db.commit()
+    return db_step
 
 # ═══════════════════════════════════════════════════════════════════════
 # ANALYTICS CRUD
 # ═══════════════════════════════════════════════════════════════════════
 
-def get_analytics_kpis(db: Session):
-    today_start = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    tasks_today = db.query(models.TaskLog).filter(models.TaskLog.start_time >= today_start).count()
-    cost_today = db.query(func.sum(models.TaskLog.estimated_cost)).filter(
-        models.TaskLog.start_time >= today_start
-    ).scalar() or 0
-    successful_tasks = db.query(models.TaskLog).filter(models.TaskLog.status == 'success').count()
-    total_tasks = db.query(models.TaskLog).count()
-    success_rate = (successful_tasks / total_tasks * 100) if total_tasks > 0 else 0
-    return {"tasks_today": tasks_today, "cost_today": cost_today, "success_rate": success_rate}
-
-def get_agent_usage_stats(db: Session):
-    return db.query(
-        models.TaskLog.agent_name,
-        func.count(models.TaskLog.id).label('task_count')
-    ).group_by(models.TaskLog.agent_name).order_by(func.count(models.TaskLog.id).desc()).all()
+def _build_analytics_stmt():
+    # All dashboard aggregates in one statement: each branch is tagged with its
+    # "kind" and returns (key, n, n_today, n_success, cost_today).
+    t = models.TaskLog.__table__
+    today = t.c.start_time >= bindparam("today_start")
+
+    def grouped(kind, key, *where):
+        return select(
+            literal(kind).label("kind"), cast(key, String).label("key"), func.count().label("n"),
+            literal(0).label("n_today"), literal(0).label("n_success"), literal(0.0).label("cost_today"),
+        ).where(*where).group_by(key)
+
+    kpis = select(
+        literal("kpi").label("kind"), cast(literal(None), String).label("key"), func.count().label("n"),
+        func.coalesce(func.sum(case((today, 1), else_=0)), 0).label("n_today"),
+        func.coalesce(func.sum(case((t.c.status == "success", 1), else_=0)), 0).label("n_success"),
+        func.coalesce(func.sum(case((today, t.c.estimated_cost), else_=0.0)), 0.0).label("cost_today"),
+    )
+    day = func.date(t.c.start_time)
+    return union_all(
+        kpis,
+        grouped("agent", t.c.agent_name),
+        grouped("status", t.c.status),
+        grouped("day", day, t.c.start_time >= bindparam("since")),
+    )
 
-def get_status_distribution(db: Session):
-    return db.query(
-        models.TaskLog.status,
-        func.count(models.TaskLog.id).label('count')
-    ).group_by(models.TaskLog.status).all()
+_ANALYTICS_STMT = _build_analytics_stmt()
 
-def get_daily_task_volume(db: Session, days: int = 7):
-    date_limit = datetime.datetime.utcnow() - timedelta(days=days)
-    return db.query(
-        func.date(models.TaskLog.start_time).label('date'),
-        func.count(models.TaskLog.id).label('task_count')
-    ).filter(
-        models.TaskLog.start_time >= date_limit
-    ).group_by(
-        func.date(models.TaskLog.start_time)
-    ).order_by(
-        func.date(models.TaskLog.start_time)
-    ).all()
+def get_analytics(db: Session, days: int = 7):
+    now = datetime.datetime.utcnow()
+    # Demux straight off the cursor; no need to materialize the row list first
+    rows = db.execute(_ANALYTICS_STMT, {
+        "today_start": now.replace(hour=0, minute=0, second=0, microsecond=0),
+        "since": now - timedelta(days=days),
+    }).mappings()
+
+    kpis = {"tasks_today": 0, "cost_today": 0.0, "success_rate": 0.0}
+    agent_usage, status_distribution, daily_volume = [], [], []
+    for row in rows:
+        if row["kind"] == "kpi":
+            total = row["n"]
+            kpis = {
+                "tasks_today": row["n_today"],
+                "cost_today": row["cost_today"] or 0.0,
+                "success_rate": (row["n_success"] / total * 100) if total > 0 else 0.0,
+            }
+        elif row["kind"] == "agent":
+            agent_usage.append({"agent_name": row["key"], "task_count": row["n"]})
+        elif row["kind"] == "status":
+            status_distribution.append({"status": row["key"], "count": row["n"]})
+        elif row["key"] is not None:
+            daily_volume.append({"date": datetime.date.fromisoformat(row["key"][:10]), "task_count": row["n"]})
+
+    agent_usage.sort(key=lambda r: r["task_count"], reverse=True)
+    daily_volume.sort(key=lambda r: r["date"])
+    return {
+        "kpis": kpis,
+        "agent_usage": agent_usage,
+        "status_distribution": status_distribution,
+        "daily_volume": daily_volume,
+    }
 
 # ═══════════════════════════════════════════════════════════════════════
 # AUTH CRUD
@@ -562,13 +681,97 @@ def create_user(db: Session, user: schemas.UserCreate):
 # ═══════════════════════════════════════════════════════════════════════
 
 def create_memory(db: Session, memory: schemas.MemoryCreate):
-    db_memory = models.Memory(**memory.dict())
+    db_memory = models.Memory(**memory.model_dump())
     db.add(db_memory)
     db.commit()
     db.refresh(db_memory)
     return db_memory
 
+def create_memories_bulk(db: Session, memories: List[schemas.MemoryCreate]):
+    # One INSERT and one commit for a whole exchange, no RETURNING or refresh
+    db.execute(insert(models.Memory), [memory.model_dump() for memory in memories])
+    db.commit()
+
 def get_memories_by_agent(db: Session, agent_name: str, skip: int = 0, limit: int = 100):
-    return db.query(models.Memory).filter(
-        models.Memory.agent_name == agent_name
-    ).order_by(models.Memory.timestamp.desc()).offset(skip).limit(limit).all()
+    m = models.Memory
+    return db.query(
+        m.id, m.agent_name, m.session_id, m.role, m.content, m.timestamp
+    ).filter(m.agent_name == agent_name).order_by(m.timestamp.desc()).offset(skip).limit(limit).all()
+
+def search_memories(db: Session, agent_name: str, query: str, limit: int = 50):
+    m = models.Memory
+    return db.query(
+        m.id, m.agent_name, m.session_id, m.role, m.content, m.timestamp
+    ).filter(
+        m.agent_name == agent_name, _fulltext_match(db, "memories", m.content, query)
+    ).order_by(m.timestamp.desc()).limit(limit).all()
+
+# ═══════════════════════════════════════════════════════════════════════
+# BULK SEED CRUD (one transaction per batch instead of one per row)
+# ═══════════════════════════════════════════════════════════════════════
+
+def count_rows(db: Session, model) -> int:
+    return db.query(func.count()).select_from(model).scalar()
+
+def bulk_create_roles(db: Session, roles: List[schemas.RoleCreate]):
+    db.bulk_insert_mappings(models.Role, [r.model_dump() for r in roles])
+    db.commit()
+
+def bulk_create_users(db: Session, users: List[schemas.UserCreate]):
+    role_ids = dict(db.query(models.Role.name, models.Role.id).filter(
+        models.Role.name.in_({u.role_name for u in users})
+    ).all())
+    missing = {u.role_name for u in users} - role_ids.keys()
+    if missing:
+        raise ValueError(f"Roles {sorted(missing)} do not exist.")
+    db.bulk_insert_mappings(models.User, [
+        {"username": u.username, "hashed_password": u.password + "_hashed", "role_id": role_ids[u.role_name]}
+        for u in users
+    ])
+    db.commit()
+
+def bulk_create_tools(db: Session, tools: List[schemas.ToolCreate]):
+    db.bulk_insert_mappings(models.Tool, [t.model_dump() for t in tools])
+    db.commit()
+
+def bulk_create_skills(db: Session, skills: List[schemas.SkillCreate]):
+    db.bulk_insert_mappings(models.Skill, [s.model_dump() for s in skills])
+    db.commit()
+
+def bulk_create_groups(db: Session, groups: List[schemas.AgentGroupCreate]):
+    db.bulk_insert_mappings(models.AgentGroup, [g.model_dump() for g in groups])
+    db.commit()
+
+def bulk_create_knowledge(db: Session, knowledge: List[schemas.AgentKnowledgeCreate]):
+    db.bulk_insert_mappings(models.AgentKnowledge, [k.model_dump() for k in knowledge])
+    db.commit()
+
+def bulk_create_agents(db: Session, agents: List[schemas.AgentCreate]):
+    # Resolve every referenced tool/skill/group with one query each, then let the
+    # unit of work batch the agent rows and association rows.
+    tools = {t.name: t for t in db.query(models.Tool).filter(
+        models.Tool.name.in_({n for a in agents for n in a.tool_names}))}
+    skills = {s.name: s for s in db.query(models.Skill).filter(
+        models.Skill.name.in_({n for a in agents for n in a.skill_names}))}
+    group_ids = dict(db.query(models.AgentGroup.name, models.AgentGroup.id).filter(
+        models.AgentGroup.name.in_({a.group_name for a in agents if a.group_name})).all())
+    db.add_all([
+        models.Agent(
+            name=a.name, description=a.description,
+            tools=[tools[n] for n in a.tool_names if n in tools],
+            skills=[skills[n] for n in a.skill_names if n in skills],
+            group_id=group_ids.get(a.group_name),
+        )
+        for a in agents
+    ])
+    db.commit()
+
+def bulk_create_workflows(db: Session, workflows: List[schemas.WorkflowCreate]):
+    db.add_all([
+        models.Workflow(
+            name=wf.name, description=wf.description, created_by=wf.created_by,
+            steps=[models.WorkflowStep(**step.model_dump()) for step in wf.steps],
+        )
+        for wf in workflows
+    ])
+    db.commit()
@@ -0,0 +1,261 @@
+"""
+Database Initialization
+========================
+One-shot schema creation, run once from the container entrypoint before the
+API workers start so that importing the app never issues DDL.
+
+Usage:
+    python -m app.init_db
+"""
+
+import logging
+
+import orjson
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from . import models
+from .database import engine
+
+logger = logging.getLogger("geni.init_db")
+
+# Columns that moved from TEXT (holding JSON strings) to JSONB
+JSONB_COLUMNS = {
+    "workflow_steps": ("config",),
+    "scheduled_tasks": ("assigned_agents", "required_skills", "required_tools"),
+    "agent_messages": ("content", "metadata_json"),
+    "agent_states": ("reasoning_trace", "scratchpad"),
+}
+
+
+# NULL instead of an error for text that doesn't parse as JSON (session-local)
+_TRY_JSONB = """
+CREATE OR REPLACE FUNCTION pg_temp.try_jsonb(value text) RETURNS jsonb AS $$
+BEGIN
+    RETURN value::jsonb;
+EXCEPTION WHEN data_exception THEN
+    RETURN NULL;
+END $$ LANGUAGE plpgsql IMMUTABLE
+"""
+
+
+def migrate_json_columns():
+    """
+    Convert pre-existing TEXT JSON columns to JSONB in place (Postgres only, idempotent).
+    Blank values become NULL; anything else that isn't valid JSON is kept as a JSON
+    string (and counted in the log) rather than aborting the migration.
+    """
+    if engine.dialect.name != "postgresql":
+        return  # SQLite's JSON type is TEXT underneath; nothing to convert
+    with engine.begin() as conn:
+        conn.execute(text(_TRY_JSONB))
+        for table, columns in JSONB_COLUMNS.items():
+            for column in columns:
+                data_type = conn.execute(text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_name = :table AND column_name = :column"
+                ), {"table": table, "column": column}).scalar()
+                if data_type != "text":
+                    continue
+                invalid = conn.execute(text(
+                    f"SELECT count(*) FROM {table} "
+                    f"WHERE btrim({column}) <> '' AND pg_temp.try_jsonb({column}) IS NULL"
+                )).scalar()
+                if invalid:
+                    logger.warning("%s.%s: %d rows aren't valid JSON, keeping them as JSON strings", table, column, invalid)
+                conn.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING CASE "
+                    f"WHEN btrim({column}) = '' THEN NULL "
+                    f"ELSE coalesce(pg_temp.try_jsonb({column}), to_jsonb({column})) END"
+                ))
+
+
+# Columns that moved from TEXT to BYTEA holding (optionally zstd-compressed) UTF-8
+COMPRESSED_COLUMNS = {
+    "task_logs": ("response_payload",),
+}
+
+
+def migrate_compressed_columns():
+    """
+    Convert pre-existing TEXT columns to BYTEA in place (Postgres only, idempotent).
+    Existing values become their uncompressed UTF-8 bytes, which CompressedText
+    still reads; only newly written values are compressed.
+    """
+    if engine.dialect.name != "postgresql":
+        return  # SQLite stores whatever it's given; CompressedText also reads the old str values
+    with engine.begin() as conn:
+        for table, columns in COMPRESSED_COLUMNS.items():
+            for column in columns:
+                data_type = conn.execute(text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_name = :table AND column_name = :column"
+                ), {"table": table, "column": column}).scalar()
+                if data_type == "text":
+                    conn.execute(text(
+                        f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BYTEA USING convert_to({column}, 'UTF8')"
+                    ))
+
+
+# task_logs columns added after release; old rows kept the same key in request_payload
+TASK_LOG_PAYLOAD_COLUMNS = ("session_id", "agent_names")
+
+
+def add_task_log_payload_columns():
+    """
+    Add newer task_logs columns to pre-existing tables and backfill each one
+    from the matching key that older rows recorded inside request_payload
+    (idempotent).
+    """
+    table = models.TaskLog.__table__
+    existing = {c["name"] for c in inspect(engine).get_columns("task_logs")}
+    for name in TASK_LOG_PAYLOAD_COLUMNS:
+        if name in existing:
+            continue
+        column_type = table.c[name].type.compile(dialect=engine.dialect)
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE task_logs ADD COLUMN {name} {column_type}"))
+            backfill = []
+            for row_id, payload in conn.execute(text(
+                f"SELECT id, request_payload FROM task_logs WHERE request_payload LIKE '%\"{name}\"%'"
+            )):
+                try:
+                    value = orjson.loads(payload).get(name)
+                except (orjson.JSONDecodeError, AttributeError):
+                    continue
+                if value:
+                    backfill.append({"row_id": row_id, "value": value})
+            if backfill:
+                conn.execute(
+                    table.update().where(table.c.id == bindparam("row_id")).values({name: bindparam("value")}),
+                    backfill,
+                )
+
+
+def add_task_log_parent_id():
+    """
+    Add the integer parent_id hierarchy column to pre-existing task_logs and
+    resolve it from the string parent_task_id in one UPDATE (idempotent). On
+    Postgres the old task_id-based foreign key is dropped as well.
+    """
+    existing = {c["name"] for c in inspect(engine).get_columns("task_logs")}
+    if "parent_id" in existing:
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE task_logs ADD COLUMN parent_id INTEGER REFERENCES task_logs (id)"))
+        conn.execute(text(
+            "UPDATE task_logs SET parent_id = "
+            "(SELECT p.id FROM task_logs p WHERE p.task_id = task_logs.parent_task_id) "
+            "WHERE parent_task_id IS NOT NULL"
+        ))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE task_logs DROP CONSTRAINT IF EXISTS task_logs_parent_task_id_fkey"))
+
+
+# Full-text documents per table. Postgres keeps each one as a stored tsvector
+# column with a GIN index; it lives outside the models so ORM loads never fetch it.
+FULLTEXT_DOCUMENTS = {
+    "memories": "coalesce(content, '')",
+    "task_logs": "coalesce(request_payload, '')",
+}
+
+
+def add_fulltext_search_columns():
+    """Add the generated search_vector column and its GIN index (Postgres only, idempotent)."""
+    if engine.dialect.name != "postgresql":
+        return  # crud falls back to a LIKE scan
+    with engine.begin() as conn:
+        for table, document in FULLTEXT_DOCUMENTS.items():
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector TSVECTOR "
+                f"GENERATED ALWAYS AS (to_tsvector('english', {document})) STORED"
+            ))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_fts ON {table} USING gin (search_vector)"))
+
+
+# Append-mostly, ever-growing tables: the default 20%-of-table thresholds mean
+# autovacuum/analyze run ever more rarely (and do ever more work when they do)
+# as they grow, leaving the planner with stale start_time/timestamp statistics
+APPEND_MOSTLY_TABLES = ("task_logs", "agent_messages")
+APPEND_MOSTLY_AUTOVACUUM = {
+    "autovacuum_vacuum_scale_factor": 0.02,
+    "autovacuum_vacuum_insert_scale_factor": 0.02,
+    "autovacuum_analyze_scale_factor": 0.01,
+}
+
+
+def tune_autovacuum():
+    """Apply per-table autovacuum thresholds (Postgres only, idempotent)."""
+    if engine.dialect.name != "postgresql":
+        return
+    options = ", ".join(f"{name} = {value}" for name, value in APPEND_MOSTLY_AUTOVACUUM.items())
+    with engine.begin() as conn:
+        for table in APPEND_MOSTLY_TABLES:
+            conn.execute(text(f"ALTER TABLE {table} SET ({options})"))
+
+
+TRIGRAM_INDEXES = {"agent_knowledge": "ix_agent_knowledge_topic_trgm"}
+
+
+def enable_trigram_search():
+    """
+    Enable pg_trgm for the trigram index on agent_knowledge.topic (Postgres only).
+    If the extension isn't installed/allowed, drop the index from the metadata so
+    the schema still builds; search just falls back to a sequential scan.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        logger.warning("pg_trgm unavailable, skipping trigram indexes: %s", e.orig)
+        for table_name, index_name in TRIGRAM_INDEXES.items():
+            table = models.Base.metadata.tables[table_name]
+            table.indexes = {i for i in table.indexes if i.name != index_name}
+
+
+# Indexes replaced by composite ones (or never used by a query); each one still costs every write
+OBSOLETE_INDEXES = (
+    "ix_task_logs_agent_name",
+    "ix_task_logs_business_unit",
+    "ix_task_logs_status",
+    "ix_task_logs_parent_task_id",
+    "ix_task_logs_parent_start",
+    "ix_task_logs_start_status_agent",
+    "ix_scheduled_tasks_status",
+)
+
+
+def drop_obsolete_indexes():
+    with engine.begin() as conn:
+        for index_name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+
+def create_missing_indexes():
+    """create_all skips indexes of tables that already exist; add newer ones explicitly."""
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def init_db():
+    """Create all tables that do not exist yet (idempotent)."""
+    enable_trigram_search()
+    models.Base.metadata.create_all(bind=engine)
+    migrate_json_columns()
+    migrate_compressed_columns()
+    add_task_log_payload_columns()
+    add_task_log_parent_id()
+    add_fulltext_search_columns()
+    drop_obsolete_indexes()
+    create_missing_indexes()
+    tune_autovacuum()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    init_db()
+    logger.info("Database schema initialized.")
@@ -1,181 +1,344 @@
 import asyncio
-import json
-import uuid
-import random
-from typing import List, Optional
-
-import aioredis
-import redis
+import itertools
+import orjson
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Iterable, List, Optional
+
+import redis.asyncio as aioredis
 from fastapi import Depends, FastAPI, HTTPException, Header, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from sqlalchemy.orm import Session
 
 from . import crud, models, schemas
-from .database import SessionLocal, engine, get_db
+from .cache import RedisCache, TTLCache
+from .database import SessionLocal, get_db
+from common.events import EVENT_STREAM, add_event
+from common.ids import next_task_id
 from common.tools import tool_registry
 
 # --- Initial Setup ---
-models.Base.metadata.create_all(bind=engine)
-app = FastAPI(title="GENi", version="3.0.0", description="AI Automation Operating System — Agentic Edition")
+# Tables are created once by `python -m app.init_db` in the container entrypoint.
+# Production skips the interactive docs and the OpenAPI schema build entirely.
+DOCS_ENABLED = os.getenv("ENVIRONMENT", "development") != "production"
+app = FastAPI(
+    title="GENi", version="3.0.0", description="AI Automation Operating System — Agentic Edition",
+    default_response_class=ORJSONResponse,
+    docs_url="/docs" if DOCS_ENABLED else None,
+    redoc_url="/redoc" if DOCS_ENABLED else None,
+    openapi_url="/openapi.json" if DOCS_ENABLED else None,
+)
 
-# CORS middleware
+# CORS middleware: pin origins via CORS_ORIGINS (comma-separated). The bundled UI
+# is same-origin and authenticates by header, so the wildcard needs no credentials.
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress the larger JSON list payloads (workflows, agents, task logs)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
-redis_conn = redis.Redis.from_url("redis://redis:6379/0", decode_responses=True)
+# Async client: handlers await Redis instead of blocking the event loop on it.
+# Pooled connections idle for 30s+ are PINGed before reuse, so an enqueue never
+# lands on a connection Redis (or a proxy) already dropped.
+redis_conn = aioredis.Redis.from_url(
+    "redis://redis:6379/0", decode_responses=True, max_connections=50, health_check_interval=30,
+)
+
+# Jobs go onto a Redis stream read by the 'workers' consumer group (see worker/app/tasks.py).
+# It is never trimmed by length: a worker XDELs each entry once it has acked it.
+TASK_STREAM = "task_stream"
+
+# Concurrent task submissions are coalesced: a background task per kind of write
+# drains everything that queued up while its previous flush was in flight and
+# writes it in one go. Callers still await their own item, so a 202 means the
+# write really happened.
+ENQUEUE_BATCH_MAX = 256
+TASK_LOG_BATCH_MAX = 256
+
+async def _submit(queue_name: str, item):
+    done = asyncio.get_running_loop().create_future()
+    getattr(app.state, queue_name).put_nowait((item, done))
+    await done
+
+async def _run_coalesced(pending: asyncio.Queue, batch_max: int, flush):
+    """Drain `pending` in batches of up to `batch_max`: await flush(items), then resolve each caller."""
+    while True:
+        batch = [await pending.get()]
+        while len(batch) < batch_max and not pending.empty():
+            batch.append(pending.get_nowait())
+        try:
+            await flush([item for item, _ in batch])
+        except Exception as e:
+            for _, done in batch:
+                if not done.done():
+                    done.set_exception(e)
+        else:
+            for _, done in batch:
+                if not done.done():
+                    done.set_result(None)
+
+async def enqueue_task(task_payload: dict, event: dict):
+    """Add a job to the task stream and its event to 'events' atomically."""
+    await _submit("enqueue_queue", (orjson.dumps(task_payload), orjson.dumps(event)))
+
+async def _flush_enqueues(jobs):
+    # One MULTI/EXEC pipeline for the whole batch
+    async with redis_conn.pipeline() as pipe:
+        for payload, event in jobs:
+            pipe.xadd(TASK_STREAM, {"p": payload})
+            add_event(pipe, event)
+        await pipe.execute()
+
+async def insert_task_log(log_entry: schemas.TaskLogCreate):
+    """Insert a task's QUEUED log row, batched with concurrent submissions into one INSERT."""
+    await _submit("task_log_queue", log_entry)
+
+def _insert_task_logs(logs: List[schemas.TaskLogCreate]):
+    db = SessionLocal()
+    try:
+        crud.create_task_logs_bulk(db, logs)
+    finally:
+        db.close()
+
+async def _flush_task_logs(logs):
+    await asyncio.to_thread(_insert_task_logs, logs)
+
+@app.on_event("startup")
+async def start_batch_flushers():
+    app.state.enqueue_queue = asyncio.Queue()
+    app.state.task_log_queue = asyncio.Queue()
+    app.state.flusher_tasks = [
+        asyncio.create_task(_run_coalesced(app.state.enqueue_queue, ENQUEUE_BATCH_MAX, _flush_enqueues)),
+        asyncio.create_task(_run_coalesced(app.state.task_log_queue, TASK_LOG_BATCH_MAX, _flush_task_logs)),
+    ]
+
+@app.on_event("shutdown")
+async def stop_batch_flushers():
+    for task in app.state.flusher_tasks:
+        task.cancel()
+    await asyncio.gather(*app.state.flusher_tasks, return_exceptions=True)
+
+# Dashboard polls these every few seconds. Catalog entries are dropped on any
+# catalog write; task stats simply expire.
+catalog_cache = RedisCache(redis_conn, ttl=30, prefix="cache:catalog:")
+stats_cache = RedisCache(redis_conn, ttl=5, prefix="cache:stats:")
+user_cache = TTLCache(ttl=60, maxsize=1024)
 
 # ═══════════════════════════════════════════════════════════════════════
-# STARTUP SEEDING
+# LOGGING (records are queued; a background thread does the stdout I/O)
 # ═══════════════════════════════════════════════════════════════════════
+logger = logging.getLogger("geni")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue: queue.Queue = queue.Queue(-1)
+logger.addHandler(QueueHandler(_log_queue))
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+_log_listener = QueueListener(_log_queue, _stream_handler)
+
 @app.on_event("startup")
-async def on_startup():
-    db = SessionLocal()
-    try:
-        print("Checking database seeding...")
-        # Seed Roles
-        if not crud.get_role_by_name(db, "Admin"):
-            print("Seeding Roles and Users...")
-            for role_name in ["Admin", "Analyst", "Viewer"]:
-                crud.create_role(db, schemas.RoleCreate(name=role_name))
-            crud.create_user(db, schemas.UserCreate(username="admin_user", password="pw", role_name="Admin"))
-            crud.create_user(db, schemas.UserCreate(username="analyst_user", password="pw", role_name="Analyst"))
-            crud.create_user(db, schemas.UserCreate(username="viewer_user", password="pw", role_name="Viewer"))
-
-        # Seed Tools
-        if not crud.get_all_tools(db):
-            print("Seeding Tools...")
-            for name, definition in tool_registry.get_all_definitions().items():
-                crud.create_tool(db, schemas.ToolCreate(name=name, description=definition.description, category="core"))
-
-        # Seed Skills
-        if not crud.get_all_skills(db):
-            print("Seeding Skills...")
-            skills_seed = [
-                {"name": "resume_parsing", "description": "Parse and extract structured data from resumes/CVs", "category": "analysis", "proficiency_level": "expert"},
-                {"name": "candidate_ranking", "description": "Rank candidates based on job requirements using scoring algorithms", "category": "reasoning", "proficiency_level": "expert"},
-                {"name": "demand_forecasting", "description": "Predict future demand using historical data and ML models", "category": "analysis", "proficiency_level": "expert"},
-                {"name": "inventory_optimization", "description": "Optimize inventory levels to minimize cost and stockouts", "category": "analysis", "proficiency_level": "intermediate"},
-                {"name": "financial_analysis", "description": "Analyze financial data, ratios, and generate reports", "category": "analysis", "proficiency_level": "expert"},
-                {"name": "compliance_review", "description": "Review documents for regulatory and policy compliance", "category": "reasoning", "proficiency_level": "expert"},
-                {"name": "report_generation", "description": "Generate structured reports from data and analysis results", "category": "communication", "proficiency_level": "intermediate"},
-                {"name": "data_extraction", "description": "Extract structured data from unstructured text or documents", "category": "analysis", "proficiency_level": "intermediate"},
-                {"name": "email_composition", "description": "Compose professional emails with appropriate tone and format", "category": "communication", "proficiency_level": "basic"},
-                {"name": "task_decomposition", "description": "Break down complex tasks into manageable sub-tasks", "category": "reasoning", "proficiency_level": "expert"},
-            ]
-            for s in skills_seed:
-                crud.create_skill(db, schemas.SkillCreate(**s))
-
-        # Seed Agent Groups
-        if not crud.get_all_groups(db):
-            print("Seeding Agent Groups...")
-            groups_seed = [
-                {"name": "Operations", "description": "Agents focused on business operations and logistics", "color": "#4a90e2"},
-                {"name": "HR & Recruiting", "description": "Agents specialized in human resources and talent acquisition", "color": "#2ecc71"},
-                {"name": "Finance", "description": "Agents handling financial analysis, auditing, and forecasting", "color": "#f39c12"},
-                {"name": "Compliance", "description": "Agents focused on regulatory compliance and policy review", "color": "#9b59b6"},
-                {"name": "General", "description": "Multi-purpose agents and orchestrators", "color": "#1abc9c"},
-            ]
-            for g in groups_seed:
-                crud.create_group(db, schemas.AgentGroupCreate(**g))
-
-        # Seed Agents (with skills and group assignments)
-        if not crud.get_agents(db):
-            print("Seeding Agents...")
-            agents_to_seed = [
-                {"name": "Orchestrator", "description": "Master agent that decomposes tasks and coordinates sub-agents", "tool_names": ["chat"], "skill_names": ["task_decomposition"], "group_name": "General"},
-                {"name": "Recruitment Agent", "description": "Expert in hiring, candidate screening, resume parsing", "tool_names": ["resume_analysis", "candidate_ranking"], "skill_names": ["resume_parsing", "candidate_ranking"], "group_name": "HR & Recruiting"},
-                {"name": "Manufacturing Optimization Agent", "description": "Expert in inventory, supply chain, production planning", "tool_names": ["inventory_check", "demand_forecasting"], "skill_names": ["demand_forecasting", "inventory_optimization"], "group_name": "Operations"},
-                {"name": "General Assistant", "description": "Handles general queries and routing help", "tool_names": ["chat", "help"], "skill_names": ["report_generation", "email_composition"], "group_name": "General"},
-                {"name": "Finance Automation Agent", "description": "Expert in forecasting, auditing, and invoice processing", "tool_names": ["financial_forecasting", "invoice_processing", "audit_log_check"], "skill_names": ["financial_analysis", "report_generation"], "group_name": "Finance"},
-                {"name": "Compliance Officer", "description": "Reviews documents for policy violations", "tool_names": ["email_sender", "report_generator"], "skill_names": ["compliance_review", "data_extraction"], "group_name": "Compliance"},
-                {"name": "Test Data Agent", "description": "Generates synthetic test data for QA environments", "tool_names": ["chat"], "skill_names": ["data_extraction"], "group_name": "Operations"},
-                {"name": "Supply Chain Agent", "description": "Monitors and optimizes supply chain operations", "tool_names": ["inventory_check", "demand_forecasting"], "skill_names": ["demand_forecasting", "inventory_optimization"], "group_name": "Operations"},
-                {"name": "HR & Recruitment Agent", "description": "Manages employee onboarding, benefits, and HR queries", "tool_names": ["chat", "email_sender"], "skill_names": ["email_composition", "report_generation"], "group_name": "HR & Recruiting"},
-            ]
-            for data in agents_to_seed:
-                crud.create_agent(db, schemas.AgentCreate(**data))
-
-        # Seed Workflows
-        if not crud.get_all_workflows(db):
-            print("Seeding Workflows...")
-            wf1 = schemas.WorkflowCreate(
-                name="Candidate Screening Pipeline",
-                description="End-to-end candidate screening: parse resume → rank → generate report",
-                steps=[
-                    schemas.WorkflowStepCreate(step_order=1, name="Parse Resume", step_type="agent", config=json.dumps({"agent_name": "Recruitment Agent", "task": "Parse the candidate resume and extract key information"})),
-                    schemas.WorkflowStepCreate(step_order=2, name="Rank Candidate", step_type="skill", config=json.dumps({"skill_name": "candidate_ranking", "agent_name": "Recruitment Agent"})),
-                    schemas.WorkflowStepCreate(step_order=3, name="Generate Report", step_type="agent", config=json.dumps({"agent_name": "General Assistant", "task": "Generate a summary report of the candidate evaluation"})),
-                ],
-                created_by="system"
-            )
-            crud.create_workflow(db, wf1)
-
-            wf2 = schemas.WorkflowCreate(
-                name="Financial Audit Pipeline",
-                description="Comprehensive financial audit: check logs → analyze → compliance review → report",
-                steps=[
-                    schemas.WorkflowStepCreate(step_order=1, name="Check Audit Logs", step_type="tool", config=json.dumps({"tool_name": "audit_log_check", "agent_name": "Finance Automation Agent"})),
-                    schemas.WorkflowStepCreate(step_order=2, name="Financial Analysis", step_type="skill", config=json.dumps({"skill_name": "financial_analysis", "agent_name": "Finance Automation Agent"})),
-                    schemas.WorkflowStepCreate(step_order=3, name="Compliance Review", step_type="agent", config=json.dumps({"agent_name": "Compliance Officer", "task": "Review the financial analysis for compliance violations"})),
-                    schemas.WorkflowStepCreate(step_order=4, name="Generate Audit Report", step_type="agent", config=json.dumps({"agent_name": "General Assistant", "task": "Generate the final audit report"})),
-                ],
-                created_by="system"
-            )
-            crud.create_workflow(db, wf2)
-
-            wf3 = schemas.WorkflowCreate(
-                name="Inventory Rebalance",
-                description="Check inventory → forecast demand → optimize → notify stakeholders",
-                steps=[
-                    schemas.WorkflowStepCreate(step_order=1, name="Check Inventory", step_type="tool", config=json.dumps({"tool_name": "inventory_check", "agent_name": "Manufacturing Optimization Agent"})),
-                    schemas.WorkflowStepCreate(step_order=2, name="Forecast Demand", step_type="skill", config=json.dumps({"skill_name": "demand_forecasting", "agent_name": "Manufacturing Optimization Agent"})),
-                    schemas.WorkflowStepCreate(step_order=3, name="Optimize Levels", step_type="skill", config=json.dumps({"skill_name": "inventory_optimization", "agent_name": "Supply Chain Agent"})),
-                ],
-                created_by="system"
-            )
-            crud.create_workflow(db, wf3)
-
-        # Seed Agent Knowledge
-        if not crud.get_knowledge_for_agent(db, "Recruitment Agent", limit=1):
-            print("Seeding Agent Knowledge...")
-            knowledge_seed = [
-                {"agent_name": "Recruitment Agent", "knowledge_type": "pattern", "topic": "resume_formats", "content": "PDF and DOCX resumes parse best. LinkedIn exports require special handling for skills section.", "confidence": 0.92},
-                {"agent_name": "Recruitment Agent", "knowledge_type": "preference", "topic": "ranking_weights", "content": "Experience weight: 0.35, Skills match: 0.30, Education: 0.20, Certifications: 0.15", "confidence": 0.88},
-                {"agent_name": "Finance Automation Agent", "knowledge_type": "fact", "topic": "quarterly_deadlines", "content": "Q1: Mar 31, Q2: Jun 30, Q3: Sep 30, Q4: Dec 31. Reports due 15 days after quarter end.", "confidence": 0.95},
-                {"agent_name": "Finance Automation Agent", "knowledge_type": "tool_usage", "topic": "invoice_processing", "content": "Invoice OCR works best with high-DPI scans. Amount extraction accuracy: 97.3% on clean scans.", "confidence": 0.85},
-                {"agent_name": "Compliance Officer", "knowledge_type": "pattern", "topic": "common_violations", "content": "Top 3 violations: 1) Missing approval signatures (34%), 2) Expired certifications (28%), 3) Budget overspend (22%)", "confidence": 0.90},
-                {"agent_name": "Manufacturing Optimization Agent", "knowledge_type": "skill_result", "topic": "demand_accuracy", "content": "7-day demand forecasts have 89% accuracy. 30-day forecasts drop to 72%. Best model: ARIMA with seasonal decomposition.", "confidence": 0.87},
-                {"agent_name": "General Assistant", "knowledge_type": "preference", "topic": "report_format", "content": "Users prefer executive summary first, then details. Tables over paragraphs for numeric data. Max 3 pages for summaries.", "confidence": 0.80},
-                {"agent_name": "Orchestrator", "knowledge_type": "pattern", "topic": "task_routing", "content": "Tasks mentioning 'resume' or 'candidate' → Recruitment Agent. 'Invoice', 'forecast', 'audit' → Finance. 'Inventory', 'supply' → Manufacturing.", "confidence": 0.93},
-            ]
-            for k in knowledge_seed:
-                crud.create_knowledge(db, schemas.AgentKnowledgeCreate(**k))
+async def start_logging():
+    _log_listener.start()
+
+@app.on_event("shutdown")
+async def stop_logging():
+    _log_listener.stop()
+
+# ═══════════════════════════════════════════════════════════════════════
+# STARTUP SEEDING
+# ═══════════════════════════════════════════════════════════════════════
+SEED_LOCK_KEY = "init:seed"
+
+# Seed data is built once at import; each section only runs against an empty table
+ROLES_SEED = ("Admin", "Analyst", "Viewer")
+USERS_SEED = (
+    schemas.UserCreate(username="admin_user", password="pw", role_name="Admin"),
+    schemas.UserCreate(username="analyst_user", password="pw", role_name="Analyst"),
+    schemas.UserCreate(username="viewer_user", password="pw", role_name="Viewer"),
+)
+
+SKILLS_SEED = (
+    {"name": "resume_parsing", "description": "Parse and extract structured data from resumes/CVs", "category": "analysis", "proficiency_level": "expert"},
+    {"name": "candidate_ranking", "description": "Rank candidates based on job requirements using scoring algorithms", "category": "reasoning", "proficiency_level": "expert"},
+    {"name": "demand_forecasting", "description": "Predict future demand using historical data and ML models", "category": "analysis", "proficiency_level": "expert"},
+    {"name": "inventory_optimization", "description": "Optimize inventory levels to minimize cost and stockouts", "category": "analysis", "proficiency_level": "intermediate"},
+    {"name": "financial_analysis", "description": "Analyze financial data, ratios, and generate reports", "category": "analysis", "proficiency_level": "expert"},
+    {"name": "compliance_review", "description": "Review documents for regulatory and policy compliance", "category": "reasoning", "proficiency_level": "expert"},
+    {"name": "report_generation", "description": "Generate structured reports from data and analysis results", "category": "communication", "proficiency_level": "intermediate"},
+    {"name": "data_extraction", "description": "Extract structured data from unstructured text or documents", "category": "analysis", "proficiency_level": "intermediate"},
+    {"name": "email_composition", "description": "Compose professional emails with appropriate tone and format", "category": "communication", "proficiency_level": "basic"},
+    {"name": "task_decomposition", "description": "Break down complex tasks into manageable sub-tasks", "category": "reasoning", "proficiency_level": "expert"},
+)
+
+GROUPS_SEED = (
+    {"name": "Operations", "description": "Agents focused on business operations and logistics", "color": "#4a90e2"},
+    {"name": "HR & Recruiting", "description": "Agents specialized in human resources and talent acquisition", "color": "#2ecc71"},
+    {"name": "Finance", "description": "Agents handling financial analysis, auditing, and forecasting", "color": "#f39c12"},
+    {"name": "Compliance", "description": "Agents focused on regulatory compliance and policy review", "color": "#9b59b6"},
+    {"name": "General", "description": "Multi-purpose agents and orchestrators", "color": "#1abc9c"},
+)
+
+AGENTS_SEED = (
+    {"name": "Orchestrator", "description": "Master agent that decomposes tasks and coordinates sub-agents", "tool_names": ["chat"], "skill_names": ["task_decomposition"], "group_name": "General"},
+    {"name": "Recruitment Agent", "description": "Expert in hiring, candidate screening, resume parsing", "tool_names": ["resume_analysis", "candidate_ranking"], "skill_names": ["resume_parsing", "candidate_ranking"], "group_name": "HR & Recruiting"},
+    {"name": "Manufacturing Optimization Agent", "description": "Expert in inventory, supply chain, production planning", "tool_names": ["inventory_check", "demand_forecasting"], "skill_names": ["demand_forecasting", "inventory_optimization"], "group_name": "Operations"},
+    {"name": "General Assistant", "description": "Handles general queries and routing help", "tool_names": ["chat", "help"], "skill_names": ["report_generation", "email_composition"], "group_name": "General"},
+    {"name": "Finance Automation Agent", "description": "Expert in forecasting, auditing, and invoice processing", "tool_names": ["financial_forecasting", "invoice_processing", "audit_log_check"], "skill_names": ["financial_analysis", "report_generation"], "group_name": "Finance"},
+    {"name": "Compliance Officer", "description": "Reviews documents for policy violations", "tool_names": ["email_sender", "report_generator"], "skill_names": ["compliance_review", "data_extraction"], "group_name": "Compliance"},
+    {"name": "Test Data Agent", "description": "Generates synthetic test data for QA environments", "tool_names": ["chat"], "skill_names": ["data_extraction"], "group_name": "Operations"},
+    {"name": "Supply Chain Agent", "description": "Monitors and optimizes supply chain operations", "tool_names": ["inventory_check", "demand_forecasting"], "skill_names": ["demand_forecasting", "inventory_optimization"], "group_name": "Operations"},
+    {"name": "HR & Recruitment Agent", "description": "Manages employee onboarding, benefits, and HR queries", "tool_names": ["chat", "email_sender"], "skill_names": ["email_composition", "report_generation"], "group_name": "HR & Recruiting"},
+)
 
+KNOWLEDGE_SEED = (
+    {"agent_name": "Recruitment Agent", "knowledge_type": "pattern", "topic": "resume_formats", "content": "PDF and DOCX resumes parse best. LinkedIn exports require special handling for skills section.", "confidence": 0.92},
+    {"agent_name": "Recruitment Agent", "knowledge_type": "preference", "topic": "ranking_weights", "content": "Experience weight: 0.35, Skills match: 0.30, Education: 0.20, Certifications: 0.15", "confidence": 0.88},
+    {"agent_name": "Finance Automation Agent", "knowledge_type": "fact", "topic": "quarterly_deadlines", "content": "Q1: Mar 31, Q2: Jun 30, Q3: Sep 30, Q4: Dec 31. Reports due 15 days after quarter end.", "confidence": 0.95},
+    {"agent_name": "Finance Automation Agent", "knowledge_type": "tool_usage", "topic": "invoice_processing", "content": "Invoice OCR works best with high-DPI scans. Amount extraction accuracy: 97.3% on clean scans.", "confidence": 0.85},
+    {"agent_name": "Compliance Officer", "knowledge_type": "pattern", "topic": "common_violations", "content": "Top 3 violations: 1) Missing approval signatures (34%), 2) Expired certifications (28%), 3) Budget overspend (22%)", "confidence": 0.90},
+    {"agent_name": "Manufacturing Optimization Agent", "knowledge_type": "skill_result", "topic": "demand_accuracy", "content": "7-day demand forecasts have 89% accuracy. 30-day forecasts drop to 72%. Best model: ARIMA with seasonal decomposition.", "confidence": 0.87},
+    {"agent_name": "General Assistant", "knowledge_type": "preference", "topic": "report_format", "content": "Users prefer executive summary first, then details. Tables over paragraphs for numeric data. Max 3 pages for summaries.", "confidence": 0.80},
+    {"agent_name": "Orchestrator", "knowledge_type": "pattern", "topic": "task_routing", "content": "Tasks mentioning 'resume' or 'candidate' → Recruitment Agent. 'Invoice', 'forecast', 'audit' → Finance. 'Inventory', 'supply' → Manufacturing.", "confidence": 0.93},
+)
+
+WORKFLOWS_SEED = (
+    schemas.WorkflowCreate(
+        name="Candidate Screening Pipeline",
+        description="End-to-end candidate screening: parse resume → rank → generate report",
+        steps=[
+            schemas.WorkflowStepCreate(step_order=1, name="Parse Resume", step_type="agent", config=orjson.dumps({"agent_name": "Recruitment Agent", "task": "Parse the candidate resume and extract key information"}).decode()),
+            schemas.WorkflowStepCreate(step_order=2, name="Rank Candidate", step_type="skill", config=orjson.dumps({"skill_name": "candidate_ranking", "agent_name": "Recruitment Agent"}).decode()),
+            schemas.WorkflowStepCreate(step_order=3, name="Generate Report", step_type="agent", config=orjson.dumps({"agent_name": "General Assistant", "task": "Generate a summary report of the candidate evaluation"}).decode()),
+        ],
+        created_by="system"
+    ),
+    schemas.WorkflowCreate(
+        name="Financial Audit Pipeline",
+        description="Comprehensive financial audit: check logs → analyze → compliance review → report",
+        steps=[
+            schemas.WorkflowStepCreate(step_order=1, name="Check Audit Logs", step_type="tool", config=orjson.dumps({"tool_name": "audit_log_check", "agent_name": "Finance Automation Agent"}).decode()),
+            schemas.WorkflowStepCreate(step_order=2, name="Financial Analysis", step_type="skill", config=orjson.dumps({"skill_name": "financial_analysis", "agent_name": "Finance Automation Agent"}).decode()),
+            schemas.WorkflowStepCreate(step_order=3, name="Compliance Review", step_type="agent", config=orjson.dumps({"agent_name": "Compliance Officer", "task": "Review the financial analysis for compliance violations"}).decode()),
+            schemas.WorkflowStepCreate(step_order=4, name="Generate Audit Report", step_type="agent", config=orjson.dumps({"agent_name": "General Assistant", "task": "Generate the final audit report"}).decode()),
+        ],
+        created_by="system"
+    ),
+    schemas.WorkflowCreate(
+        name="Inventory Rebalance",
+        description="Check inventory → forecast demand → optimize → notify stakeholders",
+        steps=[
+            schemas.WorkflowStepCreate(step_order=1, name="Check Inventory", step_type="tool", config=orjson.dumps({"tool_name": "inventory_check", "agent_name": "Manufacturing Optimization Agent"}).decode()),
+            schemas.WorkflowStepCreate(step_order=2, name="Forecast Demand", step_type="skill", config=orjson.dumps({"skill_name": "demand_forecasting", "agent_name": "Manufacturing Optimization Agent"}).decode()),
+            schemas.WorkflowStepCreate(step_order=3, name="Optimize Levels", step_type="skill", config=orjson.dumps({"skill_name": "inventory_optimization", "agent_name": "Supply Chain Agent"}).decode()),
+        ],
+        created_by="system"
+    ),
+)
+
+
+def _seed_roles(db: Session):
+    if not crud.get_role_by_name(db, "Admin"):
+        logger.info("Seeding Roles and Users...")
+        crud.bulk_create_roles(db, [schemas.RoleCreate(name=role_name) for role_name in ROLES_SEED])
+        crud.bulk_create_users(db, USERS_SEED)
+
+def _seed_tools(db: Session):
+    if crud.count_rows(db, models.Tool) == 0:
+        logger.info("Seeding Tools...")
+        crud.bulk_create_tools(db, [
+            schemas.ToolCreate(name=name, description=definition.description, category="core")
+            for name, definition in tool_registry.get_all_definitions().items()
+        ])
+
+def _seed_skills(db: Session):
+    if crud.count_rows(db, models.Skill) == 0:
+        logger.info("Seeding Skills...")
+        crud.bulk_create_skills(db, [schemas.SkillCreate(**s) for s in SKILLS_SEED])
+
+def _seed_groups(db: Session):
+    if crud.count_rows(db, models.AgentGroup) == 0:
+        logger.info("Seeding Agent Groups...")
+        crud.bulk_create_groups(db, [schemas.AgentGroupCreate(**g) for g in GROUPS_SEED])
+
+def _seed_agents(db: Session):
+    # Seed Agents (with skills and group assignments)
+    if crud.count_rows(db, models.Agent) == 0:
+        logger.info("Seeding Agents...")
+        crud.bulk_create_agents(db, [schemas.AgentCreate(**data) for data in AGENTS_SEED])
+
+def _seed_workflows(db: Session):
+    if crud.count_rows(db, models.Workflow) == 0:
+        logger.info("Seeding Workflows...")
+        crud.bulk_create_workflows(db, WORKFLOWS_SEED)
+
+def _seed_knowledge(db: Session):
+    if not crud.get_knowledge_for_agent(db, "Recruitment Agent", limit=1):
+        logger.info("Seeding Agent Knowledge...")
+        crud.bulk_create_knowledge(db, [schemas.AgentKnowledgeCreate(**k) for k in KNOWLEDGE_SEED])
+
+async def _seed_section(seed_fn):
+    """Runs one seed section on its own session in a worker thread."""
+    def run():
+        db = SessionLocal()
+        try:
+            seed_fn(db)
+        finally:
+            db.close()
+    await asyncio.to_thread(run)
+
+async def _seed():
+    try:
+        logger.info("Checking database seeding...")
+        # Independent sections first; agents reference tools/skills/groups
+        await asyncio.gather(*(_seed_section(fn) for fn in (_seed_roles, _seed_tools, _seed_skills, _seed_groups)))
+        await _seed_section(_seed_agents)
+        await asyncio.gather(_seed_section(_seed_workflows), _seed_section(_seed_knowledge))
+        await catalog_cache.ainvalidate()  # drop anything cached while tables were still empty
+        logger.info("Database seeding complete.")
+    except Exception:
+        logger.exception("Database seeding failed")
     finally:
-        db.close()
+        # Held only while seeding runs; the sections are idempotent, so a later start may re-check
+        await redis_conn.delete(SEED_LOCK_KEY)
+
+@app.on_event("startup")
+async def on_startup():
+    # Only one worker seeds in multi-worker deployments
+    if not await redis_conn.set(SEED_LOCK_KEY, "1", nx=True, ex=60):
+        logger.info("Seeding already claimed by another worker, skipping.")
+        return
+    # Seed in the background so the server starts accepting requests immediately
+    app.state.seed_task = asyncio.create_task(_seed())
 
 # ═══════════════════════════════════════════════════════════════════════
 # SECURITY
 # ═══════════════════════════════════════════════════════════════════════
 def get_current_user(x_username: str = Header("analyst_user"), db: Session = Depends(get_db)):
-    user = crud.get_user_by_username(db, username=x_username)
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    def load():
+        user = crud.get_user_by_username(db, username=x_username)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return schemas.construct_from_orm(schemas.User, user)
+    return user_cache.get_or_set(x_username, load)
 
 # ═══════════════════════════════════════════════════════════════════════
 # REQUEST MODELS
 # ═══════════════════════════════════════════════════════════════════════
 class TaskRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     task: str
     tenant_id: str = "default"
     persona_name: str = "Auto"
@@ -183,7 +346,14 @@ class TaskRequest(BaseModel):
     session_id: str = ""
     source: str = "dashboard"
 
+class TaskBatchRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    tasks: List[TaskRequest]
+
 class WebhookRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     task: str
     tenant_id: str
     persona_name: str = "Auto"
@@ -203,59 +373,116 @@ async def root():
 # CORE API ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════════
 @app.get("/api/user-info", response_model=schemas.User)
-def get_user_info(current_user: models.User = Depends(get_current_user)):
+def get_user_info(current_user: schemas.User = Depends(get_current_user)):
     return current_user
 
+# List adapters compile the core schema once; dump_json then serializes the
+# whole list in Rust instead of one model_dump + jsonable_encoder pass per row.
+# Rows straight from our own DB are trusted, so they're built with
+# construct_from_orm (no per-field coercion) instead of validated.
+_AGENT_LIST = TypeAdapter(List[schemas.Agent])
+_TOOL_LIST = TypeAdapter(List[schemas.Tool])
+_TASK_LOG_LIST = TypeAdapter(List[schemas.TaskLog])
+
 @app.get("/api/agents", response_model=List[schemas.Agent])
+@catalog_cache.cached("agents")
 def get_agents(db: Session = Depends(get_db)):
-    return crud.get_agents(db)
+    return _AGENT_LIST.dump_json([schemas.construct_from_orm(schemas.Agent, a) for a in crud.get_agents(db)])
 
 @app.post("/api/agents", response_model=schemas.Agent, status_code=201)
 def create_agent(agent: schemas.AgentCreate, db: Session = Depends(get_db)):
     existing = crud.get_agent_by_name(db, name=agent.name)
     if existing:
         raise HTTPException(status_code=409, detail=f"Agent '{agent.name}' already exists")
-    return crud.create_agent(db, agent)
+    db_agent = crud.create_agent(db, agent)
+    catalog_cache.invalidate()
+    return db_agent
 
 @app.get("/api/tools")
+@catalog_cache.cached("tools")
 def get_tools(db: Session = Depends(get_db)):
-    return crud.get_all_tools(db)
+    return _TOOL_LIST.dump_json([schemas.construct_from_orm(schemas.Tool, t) for t in crud.get_all_tools(db)])
 
 @app.post("/api/tools", status_code=201)
 def create_tool_endpoint(tool: schemas.ToolCreate, db: Session = Depends(get_db)):
     existing = crud.get_tool_by_name(db, tool.name)
     if existing:
         raise HTTPException(status_code=409, detail=f"Tool '{tool.name}' already exists")
-    return crud.create_tool(db, tool)
+    db_tool = crud.create_tool(db, tool)
+    catalog_cache.invalidate()
+    return db_tool
 
 @app.put("/api/tools/{tool_id}")
 def update_tool_endpoint(tool_id: int, update: schemas.ToolUpdate, db: Session = Depends(get_db)):
     result = crud.update_tool(db, tool_id, update)
     if not result:
         raise HTTPException(status_code=404, detail="Tool not found")
+    catalog_cache.invalidate()
     return result
 
+def _rows_response(rows) -> Response:
+    """
+    Serialize column-projected rows in one orjson call: no per-field dict building,
+    no jsonable_encoder pass. orjson writes naive datetimes exactly like isoformat().
+    """
+    return Response(orjson.dumps([r._asdict() for r in rows]), media_type="application/json")
+
+def _streamed_rows_response(load_rows: Callable[[Session], Iterable], batch_size: int = 500) -> StreamingResponse:
+    """
+    Like _rows_response, for listings that can grow to thousands of rows: the
+    JSON array is written out one batch at a time while `load_rows` iterates
+    (use yield_per), so memory stays O(batch) instead of O(rows).
+    The body opens and closes its own Session, so no pooled connection is
+    pinned by a request-scoped dependency for the length of the stream.
+    """
+    def body():
+        db = SessionLocal()
+        try:
+            rows = iter(load_rows(db))
+            sep = b"["
+            while batch := list(itertools.islice(rows, batch_size)):
+                # Strip the brackets orjson puts around each batch; we join batches ourselves
+                yield sep + orjson.dumps([r._asdict() for r in batch])[1:-1]
+                sep = b","
+            yield b"]" if sep == b"," else b"[]"
+        finally:
+            db.close()
+    return StreamingResponse(body(), media_type="application/json")
+
 @app.get("/api/task-logs", response_model=List[schemas.TaskLog])
+@stats_cache.cached("task-logs")
 def get_task_logs(db: Session = Depends(get_db)):
-    return crud.get_task_logs(db, limit=100)
+    return _TASK_LOG_LIST.dump_json([
+        schemas.construct_from_orm(schemas.TaskLog, t) for t in crud.get_task_logs(db, limit=100)
+    ])
+
+@app.get("/api/task-logs/search", response_model=List[schemas.TaskLog])
+def search_task_logs(q: str, db: Session = Depends(get_db)):
+    """Full-text search over task requests (indexed on Postgres)."""
+    return Response(_TASK_LOG_LIST.dump_json([
+        schemas.construct_from_orm(schemas.TaskLog, t) for t in crud.search_task_logs(db, q)
+    ]), media_type="application/json")
 
 @app.get("/api/analytics", response_model=schemas.AnalyticsData)
+@stats_cache.cached("analytics")
 def get_analytics(db: Session = Depends(get_db)):
-    return {
-        "kpis": crud.get_analytics_kpis(db),
-        "agent_usage": crud.get_agent_usage_stats(db),
-        "status_distribution": crud.get_status_distribution(db),
-        "daily_volume": crud.get_daily_task_volume(db)
-    }
+    # crud already returns plain ints/floats/dates in the AnalyticsData shape; orjson
+    # writes them as is, with no per-row model validation in between
+    return crud.get_analytics(db)
 
 @app.get("/api/memories/{agent_name}", response_model=List[schemas.Memory])
-def get_memories(agent_name: str, db: Session = Depends(get_db)):
-    return crud.get_memories_by_agent(db, agent_name=agent_name, limit=50)
+def get_memories(agent_name: str, q: Optional[str] = None, db: Session = Depends(get_db)):
+    # response_model stays for the OpenAPI schema; returning the response
+    # directly skips FastAPI re-validating every row against it.
+    if q:
+        return _rows_response(crud.search_memories(db, agent_name, q))
+    return _rows_response(crud.get_memories_by_agent(db, agent_name=agent_name, limit=50))
 
 # ═══════════════════════════════════════════════════════════════════════
 # SKILLS API
 # ═══════════════════════════════════════════════════════════════════════
 @app.get("/api/skills")
+@catalog_cache.cached("skills")
 def get_skills(db: Session = Depends(get_db)):
     skills = crud.get_all_skills(db)
     return [
@@ -273,13 +500,16 @@ def create_skill_endpoint(skill: schemas.SkillCreate, db: Session = Depends(get_
     existing = crud.get_skill_by_name(db, skill.name)
     if existing:
         raise HTTPException(status_code=409, detail=f"Skill '{skill.name}' already exists")
-    return crud.create_skill(db, skill)
+    result = crud.create_skill(db, skill)
+    catalog_cache.invalidate()
+    return result
 
 @app.put("/api/skills/{skill_id}")
 def update_skill_endpoint(skill_id: int, update: schemas.SkillUpdate, db: Session = Depends(get_db)):
     result = crud.update_skill(db, skill_id, update)
     if not result:
         raise HTTPException(status_code=404, detail="Skill not found")
+    catalog_cache.invalidate()
     return result
 
 @app.delete("/api/skills/{skill_id}")
@@ -287,6 +517,7 @@ def delete_skill_endpoint(skill_id: int, db: Session = Depends(get_db)):
     result = crud.delete_skill(db, skill_id)
     if not result:
         raise HTTPException(status_code=404, detail="Skill not found")
+    catalog_cache.invalidate()
     return {"deleted": True}
 
 @app.post("/api/agents/{agent_name}/skills")
@@ -294,6 +525,7 @@ def assign_skills_endpoint(agent_name: str, skill_names: List[str], db: Session
     result = crud.assign_skills_to_agent(db, agent_name, skill_names)
     if not result:
         raise HTTPException(status_code=404, detail="Agent not found")
+    catalog_cache.invalidate()
     return {"agent": agent_name, "skills": [s.name for s in result.skills]}
 
 @app.delete("/api/agents/{agent_name}/skills/{skill_name}")
@@ -301,12 +533,14 @@ def remove_skill_endpoint(agent_name: str, skill_name: str, db: Session = Depend
     result = crud.remove_skill_from_agent(db, agent_name, skill_name)
     if not result:
         raise HTTPException(status_code=404, detail="Agent not found")
+    catalog_cache.invalidate()
     return {"agent": agent_name, "skills": [s.name for s in result.skills]}
 
 # ═══════════════════════════════════════════════════════════════════════
 # AGENT GROUPS API
 # ═══════════════════════════════════════════════════════════════════════
 @app.get("/api/agent-groups")
+@catalog_cache.cached("agent-groups")
 def get_groups(db: Session = Depends(get_db)):
     groups = crud.get_all_groups(db)
     return [
@@ -314,7 +548,7 @@ def get_groups(db: Session = Depends(get_db)):
             "id": g.id, "name": g.name, "description": g.description,
             "color": g.color, "member_count": len(g.members),
             "members": [{"name": a.name, "status": a.status} for a in g.members],
-            "created_at": g.created_at.isoformat() if g.created_at else None,
+            "created_at": g.created_at,
         }
         for g in groups
     ]
@@ -324,13 +558,16 @@ def create_group_endpoint(group: schemas.AgentGroupCreate, db: Session = Depends
     existing = crud.get_group_by_name(db, group.name)
     if existing:
         raise HTTPException(status_code=409, detail=f"Group '{group.name}' already exists")
-    return crud.create_group(db, group)
+    result = crud.create_group(db, group)
+    catalog_cache.invalidate()
+    return result
 
 @app.put("/api/agent-groups/{group_id}")
 def update_group_endpoint(group_id: int, update: schemas.AgentGroupUpdate, db: Session = Depends(get_db)):
     result = crud.update_group(db, group_id, update)
     if not result:
         raise HTTPException(status_code=404, detail="Group not found")
+    catalog_cache.invalidate()
     return result
 
 @app.delete("/api/agent-groups/{group_id}")
@@ -338,6 +575,7 @@ def delete_group_endpoint(group_id: int, db: Session = Depends(get_db)):
     result = crud.delete_group(db, group_id)
     if not result:
         raise HTTPException(status_code=404, detail="Group not found")
+    catalog_cache.invalidate()
     return {"deleted": True}
 
 @app.post("/api/agent-groups/{group_id}/members")
@@ -345,6 +583,7 @@ def add_member_endpoint(group_id: int, agent_name: str, db: Session = Depends(ge
     result = crud.add_agent_to_group(db, group_id, agent_name)
     if not result:
         raise HTTPException(status_code=404, detail="Agent not found")
+    catalog_cache.invalidate()
     return {"agent": agent_name, "group_id": group_id}
 
 @app.delete("/api/agent-groups/{group_id}/members/{agent_name}")
@@ -352,6 +591,7 @@ def remove_member_endpoint(group_id: int, agent_name: str, db: Session = Depends
     result = crud.remove_agent_from_group(db, agent_name)
     if not result:
         raise HTTPException(status_code=404, detail="Agent not found")
+    catalog_cache.invalidate()
     return {"agent": agent_name, "removed_from_group": True}
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -359,23 +599,7 @@ def remove_member_endpoint(group_id: int, agent_name: str, db: Session = Depends
 # ═══════════════════════════════════════════════════════════════════════
 @app.get("/api/scheduled-tasks")
 def get_scheduled_tasks(db: Session = Depends(get_db)):
-    tasks = crud.get_all_scheduled_tasks(db)
-    return [
-        {
-            "id": t.id, "name": t.name, "description": t.description,
-            "task_description": t.task_description,
-            "cron_expression": t.cron_expression, "scheduled_at": t.scheduled_at.isoformat() if t.scheduled_at else None,
-            "next_run_at": t.next_run_at.isoformat() if t.next_run_at else None,
-            "last_run_at": t.last_run_at.isoformat() if t.last_run_at else None,
-            "last_task_id": t.last_task_id,
-            "assigned_agents": json.loads(t.assigned_agents or "[]"),
-            "auto_route": t.auto_route, "required_skills": json.loads(t.required_skills or "[]"),
-            "required_tools": json.loads(t.required_tools or "[]"),
-            "status": t.status, "repeat_count": t.repeat_count, "runs_completed": t.runs_completed,
-            "created_by": t.created_by, "created_at": t.created_at.isoformat() if t.created_at else None,
-        }
-        for t in tasks
-    ]
+    return _rows_response(crud.get_all_scheduled_tasks(db))
 
 @app.post("/api/scheduled-tasks", status_code=201)
 def create_scheduled_task_endpoint(task: schemas.ScheduledTaskCreate, db: Session = Depends(get_db)):
@@ -399,19 +623,20 @@ def delete_scheduled_task_endpoint(task_id: int, db: Session = Depends(get_db)):
 # WORKFLOWS API
 # ═══════════════════════════════════════════════════════════════════════
 @app.get("/api/workflows")
+@catalog_cache.cached("workflows")
 def get_workflows(db: Session = Depends(get_db)):
     workflows = crud.get_all_workflows(db)
     return [
         {
             "id": w.id, "name": w.name, "description": w.description,
             "is_active": w.is_active, "created_by": w.created_by,
-            "created_at": w.created_at.isoformat() if w.created_at else None,
-            "updated_at": w.updated_at.isoformat() if w.updated_at else None,
+            "created_at": w.created_at,
+            "updated_at": w.updated_at,
             "step_count": len(w.steps),
             "steps": [
                 {
                     "id": s.id, "step_order": s.step_order, "name": s.name,
-                    "step_type": s.step_type, "config": json.loads(s.config or "{}"),
+                    "step_type": s.step_type, "config": s.config or {},
                     "on_success": s.on_success, "on_failure": s.on_failure,
                 }
                 for s in w.steps
@@ -425,13 +650,16 @@ def create_workflow_endpoint(workflow: schemas.WorkflowCreate, db: Session = Dep
     existing = crud.get_workflow_by_name(db, workflow.name)
     if existing:
         raise HTTPException(status_code=409, detail=f"Workflow '{workflow.name}' already exists")
-    return crud.create_workflow(db, workflow)
+    result = crud.create_workflow(db, workflow)
+    catalog_cache.invalidate()
+    return result
 
 @app.put("/api/workflows/{workflow_id}")
 def update_workflow_endpoint(workflow_id: int, update: schemas.WorkflowUpdate, db: Session = Depends(get_db)):
     result = crud.update_workflow(db, workflow_id, update)
     if not result:
         raise HTTPException(status_code=404, detail="Workflow not found")
+    catalog_cache.invalidate()
     return result
 
 @app.delete("/api/workflows/{workflow_id}")
@@ -439,6 +667,7 @@ def delete_workflow_endpoint(workflow_id: int, db: Session = Depends(get_db)):
     result = crud.delete_workflow(db, workflow_id)
     if not result:
         raise HTTPException(status_code=404, detail="Workflow not found")
+    catalog_cache.invalidate()
     return {"deleted": True}
 
 @app.post("/api/workflows/{workflow_id}/steps", status_code=201)
@@ -446,13 +675,16 @@ def add_step_endpoint(workflow_id: int, step: schemas.WorkflowStepCreate, db: Se
     wf = crud.get_workflow_by_id(db, workflow_id)
     if not wf:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    return crud.add_workflow_step(db, workflow_id, step)
+    result = crud.add_workflow_step(db, workflow_id, step)
+    catalog_cache.invalidate()
+    return result
 
 @app.put("/api/workflow-steps/{step_id}")
 def update_step_endpoint(step_id: int, update: schemas.WorkflowStepUpdate, db: Session = Depends(get_db)):
     result = crud.update_workflow_step(db, step_id, update)
     if not result:
         raise HTTPException(status_code=404, detail="Step not found")
+    catalog_cache.invalidate()
     return result
 
 @app.delete("/api/workflow-steps/{step_id}")
@@ -460,44 +692,49 @@ def delete_step_endpoint(step_id: int, db: Session = Depends(get_db)):
     result = crud.delete_workflow_step(db, step_id)
     if not result:
         raise HTTPException(status_code=404, detail="Step not found")
+    catalog_cache.invalidate()
     return {"deleted": True}
 
 @app.post("/api/workflows/{workflow_id}/run", status_code=202)
 async def run_workflow_endpoint(workflow_id: int, db: Session = Depends(get_db)):
     """Execute a workflow by creating tasks for each step."""
-    wf = crud.get_workflow_by_id(db, workflow_id)
-    if not wf:
+    def load_workflow():
+        # Read everything needed here: wf.steps is lazy and the commit below expires wf
+        wf = crud.get_workflow_by_id(db, workflow_id)
+        return wf and (wf.id, wf.name, len(wf.steps))
+
+    workflow = await asyncio.to_thread(load_workflow)
+    if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
+    wf_id, wf_name, step_count = workflow
 
-    parent_task_id = str(uuid.uuid4())
+    parent_task_id = next_task_id()
     log_entry = schemas.TaskLogCreate(
         task_id=parent_task_id,
         agent_name="Orchestrator",
         business_unit="workflow",
         status="QUEUED",
-        request_payload=json.dumps({"workflow_id": wf.id, "workflow_name": wf.name})
+        request_payload=orjson.dumps({"workflow_id": wf_id, "workflow_name": wf_name}).decode()
     )
-    crud.create_task_log(db, log_entry)
+    await insert_task_log(log_entry)
 
     task_payload = {
         "task_id": parent_task_id,
-        "task": f"Execute workflow: {wf.name}",
+        "task": f"Execute workflow: {wf_name}",
         "persona_name": "Orchestrator",
         "tenant_id": "workflow",
         "source": "workflow",
         "use_orchestrator": True,
-        "workflow_id": wf.id,
+        "workflow_id": wf_id,
     }
-    redis_conn.rpush('task_queue', json.dumps(task_payload))
-
-    redis_conn.publish("events", json.dumps({
+    await enqueue_task(task_payload, {
         "event_type": "WORKFLOW_STARTED",
         "task_id": parent_task_id,
-        "workflow_name": wf.name,
-        "step_count": len(wf.steps),
-    }))
+        "workflow_name": wf_name,
+        "step_count": step_count,
+    })
 
-    return {"task_id": parent_task_id, "workflow": wf.name, "status": "QUEUED", "steps": len(wf.steps)}
+    return {"task_id": parent_task_id, "workflow": wf_name, "status": "QUEUED", "steps": step_count}
 
 # ═══════════════════════════════════════════════════════════════════════
 # AGENT KNOWLEDGE API
@@ -508,17 +745,7 @@ def get_agent_knowledge(agent_name: str, q: Optional[str] = None, db: Session =
         items = crud.search_knowledge(db, agent_name, q)
     else:
         items = crud.get_knowledge_for_agent(db, agent_name)
-    return [
-        {
-            "id": k.id, "agent_name": k.agent_name,
-            "knowledge_type": k.knowledge_type, "topic": k.topic,
-            "content": k.content, "confidence": k.confidence,
-            "source_task_id": k.source_task_id, "usage_count": k.usage_count,
-            "last_used_at": k.last_used_at.isoformat() if k.last_used_at else None,
-            "created_at": k.created_at.isoformat() if k.created_at else None,
-        }
-        for k in items
-    ]
+    return _rows_response(items)
 
 @app.post("/api/agent-knowledge", status_code=201)
 def create_knowledge_endpoint(knowledge: schemas.AgentKnowledgeCreate, db: Session = Depends(get_db)):
@@ -534,10 +761,8 @@ def delete_knowledge_endpoint(knowledge_id: int, db: Session = Depends(get_db)):
 # ═══════════════════════════════════════════════════════════════════════
 # TASK SUBMISSION (Dashboard / API) — with Multi-Agent Support
 # ═══════════════════════════════════════════════════════════════════════
-@app.post("/api/tasks", status_code=202)
-async def create_task(task_request: TaskRequest, db: Session = Depends(get_db)):
-    task_id = str(uuid.uuid4())
-
+def _prepare_task(task_request: TaskRequest, task_id: str):
+    """Build the task log row, queue payload and TASK_QUEUED event for one request."""
     # Determine agent name(s)
     agent_display = task_request.persona_name
     if task_request.agent_names and len(task_request.agent_names) > 0:
@@ -548,13 +773,13 @@ async def create_task(task_request: TaskRequest, db: Session = Depends(get_db)):
         agent_name=agent_display,
         business_unit=task_request.tenant_id,
         status="QUEUED",
-        request_payload=json.dumps({
+        session_id=task_request.session_id or None,
+        agent_names=task_request.agent_names or None,
+        request_payload=orjson.dumps({
             "task": task_request.task,
             "source": task_request.source,
-            "agent_names": task_request.agent_names,
-        })
+        }).decode()
     )
-    crud.create_task_log(db, log_entry)
 
     task_payload = {
         "task_id": task_id,
@@ -566,42 +791,71 @@ async def create_task(task_request: TaskRequest, db: Session = Depends(get_db)):
         "source": task_request.source,
         "use_orchestrator": True,
     }
-    redis_conn.rpush('task_queue', json.dumps(task_payload))
 
-    redis_conn.publish("events", json.dumps({
+    event = {
         "event_type": "TASK_QUEUED",
         "task_id": task_id,
         "persona_name": agent_display,
         "agent_names": task_request.agent_names,
-    }))
+    }
+    return log_entry, task_payload, event
+
+@app.post("/api/tasks", status_code=202)
+async def create_task(task_request: TaskRequest):
+    task_id = next_task_id()
+    log_entry, task_payload, event = _prepare_task(task_request, task_id)
+
+    await insert_task_log(log_entry)
+    await enqueue_task(task_payload, event)
+
+    return {"task_id": task_id, "status": "QUEUED", "agents": log_entry.agent_name}
+
+@app.post("/api/tasks/bulk", status_code=202)
+async def create_tasks_bulk(batch: TaskBatchRequest, db: Session = Depends(get_db)):
+    """Enqueue many tasks with one INSERT and one pipelined Redis round trip."""
+    if not batch.tasks:
+        raise HTTPException(status_code=422, detail="No tasks supplied")
+
+    task_ids = [next_task_id() for _ in batch.tasks]
+    prepared = [_prepare_task(t, tid) for t, tid in zip(batch.tasks, task_ids)]
 
-    return {"task_id": task_id, "status": "QUEUED", "agents": agent_display}
+    await asyncio.to_thread(crud.create_task_logs_bulk, db, [log_entry for log_entry, _, _ in prepared])
+
+    async with redis_conn.pipeline() as pipe:
+        # Same per-task TASK_QUEUED events as /api/tasks, so the dashboard needs no special case
+        for _, payload, event in prepared:
+            pipe.xadd(TASK_STREAM, {"p": orjson.dumps(payload)})
+            add_event(pipe, orjson.dumps(event))
+        await pipe.execute()
+
+    return {"task_ids": task_ids, "status": "QUEUED"}
 
 # ═══════════════════════════════════════════════════════════════════════
 # WEBHOOK ENDPOINT (OpenClaw → Enterprise Core)
 # ═══════════════════════════════════════════════════════════════════════
 @app.post("/v1/openclaw/webhook", status_code=202)
-async def openclaw_webhook(request: WebhookRequest, db: Session = Depends(get_db)):
+async def openclaw_webhook(request: WebhookRequest):
     """
     Webhook endpoint for OpenClaw CLI integration.
     """
-    task_id = str(uuid.uuid4())
-    session_id = request.session_id or str(uuid.uuid4())
+    task_id = next_task_id()
+    session_id = request.session_id or next_task_id()
 
     log_entry = schemas.TaskLogCreate(
         task_id=task_id,
         agent_name=request.persona_name,
         business_unit=request.tenant_id,
         status="QUEUED",
-        request_payload=json.dumps({
+        session_id=session_id,
+        request_payload=orjson.dumps({
             "task": request.task,
             "source": request.source,
             "initiator": request.initiator,
             "callback_url": request.callback_url,
             "session_id": session_id,
-        })
+        }).decode()
     )
-    crud.create_task_log(db, log_entry)
+    await insert_task_log(log_entry)
 
     task_payload = {
         "task_id": task_id,
@@ -614,15 +868,13 @@ async def openclaw_webhook(request: WebhookRequest, db: Session = Depends(get_db
         "callback_url": request.callback_url,
         "initiator": request.initiator,
     }
-    redis_conn.rpush('task_queue', json.dumps(task_payload))
-
-    redis_conn.publish("events", json.dumps({
+    await enqueue_task(task_payload, {
         "event_type": "TASK_QUEUED",
         "task_id": task_id,
         "source": "webhook",
         "initiator": request.initiator,
         "session_id": session_id,
-    }))
+    })
 
     return {
         "task_id": task_id,
@@ -634,21 +886,26 @@ async def openclaw_webhook(request: WebhookRequest, db: Session = Depends(get_db
 # ═══════════════════════════════════════════════════════════════════════
 # OPENCLAW EXECUTOR APIs (Bidirectional Communication)
 # ═══════════════════════════════════════════════════════════════════════
-@app.get("/v1/openclaw/task/{task_id}/status")
-async def openclaw_task_status(task_id: str, db: Session = Depends(get_db)):
-    """Poll endpoint for OpenClaw to check task status and get results."""
-    task_log = crud.get_task_log_by_id(db, task_id)
+TERMINAL_TASK_STATUSES = ("success", "failure", "partial_success")
+
+# Status polls are served from Redis: a finished task's answer never changes, an
+# in-flight one may be up to a second stale.
+TASK_STATUS_TTL = 1
+TASK_STATUS_TERMINAL_TTL = 3600
+
+def _build_task_status(db: Session, task_id: str):
+    task_log = crud.get_task_log_with_details(db, task_id)
     if not task_log:
-        raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found")
+        return None
 
-    agent_state = crud.get_agent_state(db, task_id)
+    agent_state = task_log.agent_state
 
     response = {
         "task_id": task_id,
         "status": task_log.status,
         "agent_name": task_log.agent_name,
-        "started_at": task_log.start_time.isoformat() if task_log.start_time else None,
-        "completed_at": task_log.end_time.isoformat() if task_log.end_time else None,
+        "started_at": task_log.start_time,
+        "completed_at": task_log.end_time,
         "duration_ms": task_log.duration_ms,
     }
 
@@ -657,16 +914,17 @@ async def openclaw_task_status(task_id: str, db: Session = Depends(get_db)):
             "current_step": agent_state.current_step,
             "max_steps": agent_state.max_steps,
             "loop_status": agent_state.status,
-            "reasoning_trace": json.loads(agent_state.reasoning_trace or "[]"),
+            # Tasks run before steps got their own table kept them on the state row
+            "reasoning_trace": [st.content for st in agent_state.reasoning_steps] or agent_state.reasoning_trace or [],
         }
 
-    if task_log.status in ("success", "failure", "partial_success"):
-        response["result"] = json.loads(task_log.response_payload) if task_log.response_payload else None
+    if task_log.status in TERMINAL_TASK_STATUSES:
+        response["result"] = orjson.loads(task_log.response_payload) if task_log.response_payload else None
         response["model_used"] = task_log.primary_model_used
         response["token_usage"] = task_log.token_usage
         response["estimated_cost"] = task_log.estimated_cost
 
-    sub_tasks = crud.get_sub_tasks(db, task_id)
+    sub_tasks = task_log.sub_tasks
     if sub_tasks:
         response["sub_tasks"] = [
             {
@@ -681,53 +939,123 @@ async def openclaw_task_status(task_id: str, db: Session = Depends(get_db)):
 
     return response
 
+@app.get("/v1/openclaw/task/{task_id}/status")
+async def openclaw_task_status(task_id: str, db: Session = Depends(get_db)):
+    """Poll endpoint for OpenClaw to check task status and get results."""
+    cache_key = f"cache:tstatus:{task_id}"
+    body = await redis_conn.get(cache_key)
+    if body is None:
+        response = await asyncio.to_thread(_build_task_status, db, task_id)
+        if response is None:
+            raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found")
+        body = orjson.dumps(response)
+        ttl = TASK_STATUS_TERMINAL_TTL if response["status"] in TERMINAL_TASK_STATUSES else TASK_STATUS_TTL
+        await redis_conn.set(cache_key, body, ex=ttl)
+    return Response(body, media_type="application/json")
+
+# SSE streams send a comment line this often so proxies keep them open, re-check
+# the task row after TASK_STREAM_RECHECK seconds without an update (in case one
+# was missed), and give up after TASK_STREAM_MAX_IDLE seconds of silence, e.g.
+# when the worker running the task died.
+TASK_STREAM_KEEPALIVE = 15
+TASK_STREAM_RECHECK = 60
+TASK_STREAM_MAX_IDLE = 30 * 60
+
+def _load_task_snapshot(task_id: str) -> Optional[dict]:
+    """Status snapshot on a short-lived Session, so a stream never pins a pooled connection."""
+    db = SessionLocal()
+    try:
+        task_log = crud.get_task_log_by_id(db, task_id)
+        if not task_log:
+            return None
+        return {"task_id": task_id, "status": task_log.status, "duration_ms": task_log.duration_ms}
+    finally:
+        db.close()
+
+@app.get("/v1/openclaw/task/{task_id}/stream")
+async def openclaw_task_stream(task_id: str):
+    """
+    Server-sent events alternative to polling /status.
+    Forwards the worker's updates on 'task:{task_id}:updates' and closes on a terminal status.
+    """
+    # Subscribe before reading the row so a completion in between isn't missed
+    pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+    try:
+        await pubsub.subscribe(f"task:{task_id}:updates")
+        snapshot = await asyncio.to_thread(_load_task_snapshot, task_id)
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found")
+    except BaseException:
+        await pubsub.aclose()
+        raise
+
+    async def event_gen():
+        try:
+            yield f"data: {orjson.dumps(snapshot).decode()}\n\n"
+            if snapshot["status"] in TERMINAL_TASK_STATUSES:
+                return
+            last_status = snapshot["status"]
+            idle = 0
+            while idle < TASK_STREAM_MAX_IDLE:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=TASK_STREAM_KEEPALIVE)
+                if message is None:
+                    idle += TASK_STREAM_KEEPALIVE
+                    if idle % TASK_STREAM_RECHECK == 0:
+                        current = await asyncio.to_thread(_load_task_snapshot, task_id)
+                        if current and current["status"] != last_status:
+                            last_status = current["status"]
+                            yield f"data: {orjson.dumps(current).decode()}\n\n"
+                            if last_status in TERMINAL_TASK_STATUSES:
+                                return
+                            idle = 0
+                            continue
+                    yield ": keepalive\n\n"
+                    continue
+                idle = 0
+                yield f"data: {message['data']}\n\n"
+                last_status = orjson.loads(message["data"]).get("status")
+                if last_status in TERMINAL_TASK_STATUSES:
+                    return
+        finally:
+            await pubsub.aclose()
+
+    return StreamingResponse(event_gen(), media_type="text/event-stream")
+
 @app.get("/v1/openclaw/task/{task_id}/tree")
-async def openclaw_task_tree(task_id: str, db: Session = Depends(get_db)):
+def openclaw_task_tree(task_id: str, db: Session = Depends(get_db)):
     tree = crud.get_task_tree(db, task_id)
     if not tree:
         raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found")
     return tree
 
 @app.get("/v1/openclaw/task/{task_id}/messages")
-async def openclaw_task_messages(task_id: str, db: Session = Depends(get_db)):
-    messages = crud.get_messages_for_task(db, task_id)
-    return [
-        {
-            "message_id": m.message_id,
-            "sender": m.sender_agent,
-            "receiver": m.receiver_agent,
-            "type": m.message_type,
-            "content": json.loads(m.content) if m.content else None,
-            "status": m.status,
-            "timestamp": m.timestamp.isoformat(),
-        }
-        for m in messages
-    ]
+def openclaw_task_messages(task_id: str):
+    return _streamed_rows_response(lambda db: crud.get_messages_for_task(db, task_id))
 
 @app.get("/v1/openclaw/session/{session_id}/history")
-async def openclaw_session_history(session_id: str, db: Session = Depends(get_db)):
-    all_logs = crud.get_task_logs(db, limit=500)
+def openclaw_session_history(session_id: str, db: Session = Depends(get_db)):
     session_tasks = []
-    for log in all_logs:
+    for log in crud.get_task_logs_for_session(db, session_id):
         try:
-            payload = json.loads(log.request_payload) if log.request_payload else {}
-            if payload.get("session_id") == session_id:
-                session_tasks.append({
-                    "task_id": log.task_id,
-                    "agent_name": log.agent_name,
-                    "status": log.status,
-                    "request": payload.get("task", ""),
-                    "response": json.loads(log.response_payload).get("summary", "") if log.response_payload else None,
-                    "timestamp": log.start_time.isoformat() if log.start_time else None,
-                })
-        except (json.JSONDecodeError, AttributeError):
+            payload = orjson.loads(log.request_payload) if log.request_payload else {}
+            session_tasks.append({
+                "task_id": log.task_id,
+                "agent_name": log.agent_name,
+                "agent_names": log.agent_names,
+                "status": log.status,
+                "request": payload.get("task", ""),
+                "response": orjson.loads(log.response_payload).get("summary", "") if log.response_payload else None,
+                "timestamp": log.start_time,
+            })
+        except (orjson.JSONDecodeError, AttributeError):
             continue
 
-    return {
+    # Raw datetimes: orjson formats them natively, like isoformat()
+    return Response(orjson.dumps({
         "session_id": session_id,
         "task_count": len(session_tasks),
         "tasks": session_tasks,
-    }
+    }), media_type="application/json")
 
 # ═══════════════════════════════════════════════════════════════════════
 # OBSERVABILITY ENDPOINTS
@@ -735,38 +1063,12 @@ async def openclaw_session_history(session_id: str, db: Session = Depends(get_db
 @app.get("/api/agent-states")
 def get_active_agent_states(db: Session = Depends(get_db)):
     """Get all active agent execution states for the observability dashboard."""
-    from sqlalchemy import not_
-    active_states = db.query(models.AgentState).filter(
-        not_(models.AgentState.status.in_(["complete", "failed"]))
-    ).all()
-    return [
-        {
-            "task_id": s.task_id,
-            "agent_name": s.agent_name,
-            "current_step": s.current_step,
-            "max_steps": s.max_steps,
-            "status": s.status,
-            "updated_at": s.updated_at.isoformat() if s.updated_at else None,
-        }
-        for s in active_states
-    ]
+    return _rows_response(crud.get_active_agent_states(db))
 
 @app.get("/api/agent-messages/{task_id}")
-def get_agent_messages(task_id: str, db: Session = Depends(get_db)):
+def get_agent_messages(task_id: str):
     """Get inter-agent messages for a specific task."""
-    messages = crud.get_messages_for_task(db, task_id)
-    return [
-        {
-            "message_id": m.message_id,
-            "sender": m.sender_agent,
-            "receiver": m.receiver_agent,
-            "type": m.message_type,
-            "content": m.content,
-            "status": m.status,
-            "timestamp": m.timestamp.isoformat() if m.timestamp else None,
-        }
-        for m in messages
-    ]
+    return _streamed_rows_response(lambda db: crud.get_messages_for_task(db, task_id))
 
 @app.get("/api/task-tree/{task_id}")
 def get_task_tree(task_id: str, db: Session = Depends(get_db)):
@@ -779,28 +1081,71 @@ def get_task_tree(task_id: str, db: Session = Depends(get_db)):
 # ═══════════════════════════════════════════════════════════════════════
 # WEBSOCKET EVENT STREAM (Real-Time Observability)
 # ═══════════════════════════════════════════════════════════════════════
+EVENT_QUEUE_SIZE = 1000
+EVENT_READ_COUNT = 500
+EVENT_READ_BLOCK_MS = 5000
+
+
+async def _events_fanout():
+    """Single reader of the event stream per process; copies each event to every client queue."""
+    last_id = "$"  # only events added from now on
+    while True:
+        try:
+            streams = await redis_conn.xread(
+                {EVENT_STREAM: last_id}, count=EVENT_READ_COUNT, block=EVENT_READ_BLOCK_MS,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Redis restarted or the connection dropped: retry from the last entry seen
+            logger.exception("Event fan-out reader failed, reconnecting")
+            await asyncio.sleep(1)
+            continue
+        if not streams:
+            continue
+        entries = streams[0][1]
+        last_id = entries[-1][0]
+        for client_q in list(app.state.subscribers):
+            for _, fields in entries:
+                try:
+                    client_q.put_nowait(fields["p"])
+                except asyncio.QueueFull:
+                    # Slow client: drop the event rather than stall everyone else
+                    break
+
+
+@app.on_event("startup")
+async def start_events_fanout():
+    app.state.subscribers = set()
+    app.state.fanout_task = asyncio.create_task(_events_fanout())
+
+
+@app.on_event("shutdown")
+async def stop_events_fanout():
+    app.state.fanout_task.cancel()
+    try:
+        await app.state.fanout_task
+    except asyncio.CancelledError:
+        pass
+    await redis_conn.aclose()
+
+
 @app.websocket("/ws/events")
 async def websocket_events(websocket: WebSocket):
     """
     WebSocket endpoint for real-time event streaming.
-    Subscribes to the Redis Pub/Sub 'events' channel and forwards all events to the client.
+    Receives events from the shared 'events' stream reader and forwards them to the client.
     """
     await websocket.accept()
 
+    client_q: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+    app.state.subscribers.add(client_q)
     try:
-        aredis = aioredis.from_url("redis://redis:6379/0", decode_responses=True)
-        pubsub = aredis.pubsub()
-        await pubsub.subscribe("events")
-
         while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-            if message and message["type"] == "message":
-                await websocket.send_text(message["data"])
-            await asyncio.sleep(0.1)
+            await websocket.send_text(await client_q.get())
     except WebSocketDisconnect:
-        print("WebSocket client disconnected")
+        logger.info("WebSocket client disconnected")
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.exception("WebSocket error: %s", e)
     finally:
-        if pubsub:
-            await pubsub.unsubscribe("events")
+        app.state.subscribers.discard(client_q)
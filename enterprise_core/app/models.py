@@ -1,7 +1,52 @@
-from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey, DateTime, Float, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey, DateTime, Float, JSON, Index, LargeBinary, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import backref, foreign, relationship
+from sqlalchemy.types import TypeDecorator
 from .database import Base
 import datetime
+import threading
+import zstandard
+
+# Native JSON (JSONB on Postgres): the driver hands back dicts/lists, no json.loads per row
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class CompressedText(TypeDecorator):
+    """
+    A str column stored as bytes (BYTEA/BLOB), zstd-compressed once the value is
+    big enough for that to pay off. Reads also accept the uncompressed bytes and
+    plain str left by rows written before the column was converted.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    MIN_COMPRESS_SIZE = 1024
+    ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+    _contexts = threading.local()  # zstd (de)compressors aren't safe to share across threads
+
+    @classmethod
+    def _context(cls, name: str, factory):
+        ctx = getattr(cls._contexts, name, None)
+        if ctx is None:
+            ctx = factory()
+            setattr(cls._contexts, name, ctx)
+        return ctx
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        data = value.encode()
+        if len(data) < self.MIN_COMPRESS_SIZE:
+            return data
+        return self._context("cctx", lambda: zstandard.ZstdCompressor(level=3)).compress(data)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        data = bytes(value)
+        if data[:4] == self.ZSTD_MAGIC:
+            data = self._context("dctx", zstandard.ZstdDecompressor).decompress(data)
+        return data.decode()
 
 # ═══════════════════════════════════════════════════════════════════════
 # ASSOCIATION TABLES (Many-to-Many)
@@ -91,17 +136,29 @@ class Skill(Base):
 
 class TaskLog(Base):
     __tablename__ = "task_logs"
+    __table_args__ = (
+        # Covers the dashboard analytics scan (time window + status/agent grouping, cost
+        # sums) and the newest-first listing; on Postgres an index-only scan
+        Index("ix_task_logs_analytics", "start_time", "status", "agent_name",
+              postgresql_include=["estimated_cost"]),
+        # Session history: equality on session_id, newest first
+        Index("ix_task_logs_session_start", "session_id", "start_time"),
+        # Sub-task lookups and tree walks: equality on parent_id, oldest first
+        Index("ix_task_logs_parent_id_start", "parent_id", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(String, unique=True, index=True)
-    agent_name = Column(String, index=True)
-    business_unit = Column(String, index=True)
-    status = Column(String, index=True)
+    agent_name = Column(String)
+    business_unit = Column(String)
+    status = Column(String)
     start_time = Column(DateTime, default=datetime.datetime.utcnow)
     end_time = Column(DateTime, nullable=True)
     duration_ms = Column(Integer, nullable=True)
     request_payload = Column(Text)
-    response_payload = Column(Text, nullable=True)
+    response_payload = Column(CompressedText, nullable=True)        # Orchestrator results run to tens of KB
+    session_id = Column(String, nullable=True)                      # OpenClaw / dashboard conversation
+    agent_names = Column(JSONDocument, nullable=True)               # Multi-agent requests; agent_name holds the joined display
 
     # Model Router Visualization Fields
     primary_model_used = Column(String, nullable=True)
@@ -109,18 +166,35 @@ class TaskLog(Base):
     token_usage = Column(Integer, nullable=True)
     estimated_cost = Column(Float, nullable=True)
 
-    # Sub-Task Hierarchy
-    parent_task_id = Column(String, ForeignKey('task_logs.task_id'), nullable=True, index=True)
+    # Sub-Task Hierarchy: joins go through the integer parent_id; parent_task_id
+    # is kept as the parent's external ID for API responses only
+    parent_id = Column(Integer, ForeignKey('task_logs.id'), nullable=True)
+    parent_task_id = Column(String, nullable=True)
     depth = Column(Integer, default=0)
     delegated_by = Column(String, nullable=True)
 
-    parent_task = relationship("TaskLog", remote_side=[task_id],
-                               backref="sub_tasks", foreign_keys=[parent_task_id])
+    parent_task = relationship("TaskLog", remote_side=[id],
+                               backref=backref("sub_tasks", order_by="TaskLog.start_time"),
+                               foreign_keys=[parent_id])
+    # Agent loop state for this task (joined by task_id; there is no FK column)
+    agent_state = relationship("AgentState", uselist=False, viewonly=True,
+                               primaryjoin="TaskLog.task_id == foreign(AgentState.task_id)")
 
 
 class ScheduledTask(Base):
     """Tasks that are planned for future or recurring execution."""
     __tablename__ = "scheduled_tasks"
+    __table_args__ = (
+        # jsonb_path_ops GIN indexes for containment lookups (required_skills @> '["x"]'); Postgres only
+        Index("ix_scheduled_required_skills", "required_skills",
+              postgresql_using="gin", postgresql_ops={"required_skills": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_scheduled_required_tools", "required_tools",
+              postgresql_using="gin", postgresql_ops={"required_tools": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        # Scheduler poll (active and due): a partial index holds only the active rows,
+        # so paused/completed history never bloats it
+        Index("ix_scheduled_active_next_run", "next_run_at",
+              postgresql_where=text("status = 'active'"), sqlite_where=text("status = 'active'")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -131,11 +205,11 @@ class ScheduledTask(Base):
     next_run_at = Column(DateTime, nullable=True)
     last_run_at = Column(DateTime, nullable=True)
     last_task_id = Column(String, nullable=True)                    # Links to last TaskLog.task_id
-    assigned_agents = Column(Text, default="[]")                    # JSON array of agent names
+    assigned_agents = Column(JSONDocument, default=list)            # Array of agent names
     auto_route = Column(Integer, default=1)                         # 1 = let orchestrator pick
-    required_skills = Column(Text, default="[]")                    # JSON array of skill names
-    required_tools = Column(Text, default="[]")                     # JSON array of tool names
-    status = Column(String, default="active", index=True)           # "active", "paused", "completed"
+    required_skills = Column(JSONDocument, default=list)            # Array of skill names
+    required_tools = Column(JSONDocument, default=list)             # Array of tool names
+    status = Column(String, default="active")                       # "active", "paused", "completed"
     repeat_count = Column(Integer, default=0)                       # 0 = infinite for cron, N = run N times
     runs_completed = Column(Integer, default=0)
     created_by = Column(String, default="system")
@@ -170,7 +244,7 @@ class WorkflowStep(Base):
     step_order = Column(Integer)
     name = Column(String)
     step_type = Column(String)                                      # "agent", "tool", "skill", "condition", "delay"
-    config = Column(Text, default="{}")                             # JSON: agent_name, tool_name, params, etc.
+    config = Column(JSONDocument, default=dict)                     # agent_name, tool_name, params, etc.
     on_success = Column(String, default="next")                     # "next" | "step_N" | "end"
     on_failure = Column(String, default="abort")                    # "retry" | "skip" | "abort"
 
@@ -184,6 +258,10 @@ class WorkflowStep(Base):
 class AgentMessage(Base):
     """Inter-agent communication messages on the agent communication bus."""
     __tablename__ = "agent_messages"
+    __table_args__ = (
+        # Per-task message timeline (task_id equality, ordered by time)
+        Index("ix_agent_messages_task_time", "task_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     message_id = Column(String, unique=True, index=True)
@@ -194,8 +272,8 @@ class AgentMessage(Base):
     receiver_agent = Column(String, index=True)
     message_type = Column(String, index=True)  # "request", "response", "delegate", "result", "broadcast"
 
-    content = Column(Text)
-    metadata_json = Column(Text, nullable=True)
+    content = Column(JSONDocument)
+    metadata_json = Column(JSONDocument, nullable=True)
 
     status = Column(String, default="pending")
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
@@ -204,6 +282,13 @@ class AgentMessage(Base):
 class AgentState(Base):
     """Tracks the execution state of an agent during a multi-step agentic loop."""
     __tablename__ = "agent_states"
+    FINISHED_STATUSES = ("complete", "failed")
+    __table_args__ = (
+        # Partial index for the dashboard's "active states" listing
+        Index("ix_agent_states_active", "status",
+              postgresql_where=text("status NOT IN ('complete', 'failed')"),
+              sqlite_where=text("status NOT IN ('complete', 'failed')")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(String, unique=True, index=True)
@@ -213,12 +298,32 @@ class AgentState(Base):
     max_steps = Column(Integer, default=10)
     status = Column(String, default="thinking")
 
-    reasoning_trace = Column(Text, default="[]")
-    scratchpad = Column(Text, default="{}")
+    reasoning_trace = Column(JSONDocument, default=list)           # Legacy; new steps go to agent_reasoning_steps
+    scratchpad = Column(JSONDocument, default=dict)
 
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
+    # Joined by task_id; there is no FK column
+    reasoning_steps = relationship("ReasoningStep", viewonly=True, order_by="ReasoningStep.id",
+                                   primaryjoin="AgentState.task_id == foreign(ReasoningStep.task_id)")
+
+
+class ReasoningStep(Base):
+    """One Think → Act → Observe step of an agent loop, stored append-only (one INSERT per step)."""
+    __tablename__ = "agent_reasoning_steps"
+    __table_args__ = (
+        # A task's steps in insertion order (a retried loop appends its steps again)
+        Index("ix_agent_reasoning_steps_task", "task_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(String)
+    step_index = Column(Integer)
+    kind = Column(String)                      # The step's action: "use_tool", "delegate", "final_answer", ...
+    content = Column(JSONDocument)             # ExecutionStep.to_dict()
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # MEMORY & KNOWLEDGE
@@ -239,6 +344,12 @@ class Memory(Base):
 class AgentKnowledge(Base):
     """Long-term agent knowledge and recall — patterns, facts, and learned preferences."""
     __tablename__ = "agent_knowledge"
+    __table_args__ = (
+        # Trigram GIN index so search_knowledge's topic ILIKE '%q%' can skip the
+        # sequential scan (needs pg_trgm, enabled by init_db; Postgres only)
+        Index("ix_agent_knowledge_topic_trgm", "topic",
+              postgresql_using="gin", postgresql_ops={"topic": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     agent_name = Column(String, index=True)
@@ -264,7 +375,7 @@ class User(Base):
     hashed_password = Column(String)
     role_id = Column(Integer, ForeignKey('roles.id'))
 
-    role = relationship("Role", back_populates="users")
+    role = relationship("Role", back_populates="users", lazy="joined")  # Always serialized with the user
 
 
 class Role(Base):
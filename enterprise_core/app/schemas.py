@@ -1,12 +1,24 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Json
+from typing import List, Optional, Dict, Any, Tuple, Type, TypeVar, get_args, get_origin
 from datetime import datetime, date
 
+class Schema(BaseModel):
+    """
+    Base for every schema here. Core schemas are built on first use instead of
+    at import, so a process only pays for the models it touches (the worker
+    uses a handful; FastAPI builds the API's ones as routes are registered).
+    """
+    model_config = ConfigDict(defer_build=True)
+
+# Response schemas read straight off ORM objects; one shared config for all of them
+ORM_CONFIG = ConfigDict(from_attributes=True)
+
 # ═══════════════════════════════════════════════════════════════════════
 # TOOL SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class ToolBase(BaseModel):
+class ToolBase(Schema):
     name: str
     description: Optional[str] = None
 
@@ -15,7 +27,7 @@ class ToolCreate(ToolBase):
     parameters_schema: Optional[str] = None
     version: str = "1.0"
 
-class ToolUpdate(BaseModel):
+class ToolUpdate(Schema):
     description: Optional[str] = None
     category: Optional[str] = None
     parameters_schema: Optional[str] = None
@@ -28,13 +40,13 @@ class Tool(ToolBase):
     parameters_schema: Optional[str] = None
     version: str = "1.0"
     is_active: int = 1
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # SKILL SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class SkillBase(BaseModel):
+class SkillBase(Schema):
     name: str
     description: Optional[str] = None
     category: str = "general"
@@ -43,7 +55,7 @@ class SkillBase(BaseModel):
 class SkillCreate(SkillBase):
     parameters_schema: Optional[str] = None
 
-class SkillUpdate(BaseModel):
+class SkillUpdate(Schema):
     description: Optional[str] = None
     category: Optional[str] = None
     proficiency_level: Optional[str] = None
@@ -54,13 +66,13 @@ class Skill(SkillBase):
     id: int
     parameters_schema: Optional[str] = None
     is_active: int = 1
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # AGENT GROUP SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class AgentGroupBase(BaseModel):
+class AgentGroupBase(Schema):
     name: str
     description: Optional[str] = None
     color: str = "#4a90e2"
@@ -68,7 +80,7 @@ class AgentGroupBase(BaseModel):
 class AgentGroupCreate(AgentGroupBase):
     pass
 
-class AgentGroupUpdate(BaseModel):
+class AgentGroupUpdate(Schema):
     name: Optional[str] = None
     description: Optional[str] = None
     color: Optional[str] = None
@@ -76,13 +88,13 @@ class AgentGroupUpdate(BaseModel):
 class AgentGroup(AgentGroupBase):
     id: int
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # AGENT SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class AgentBase(BaseModel):
+class AgentBase(Schema):
     name: str
     description: Optional[str] = None
 
@@ -99,13 +111,13 @@ class Agent(AgentBase):
     current_model: Optional[str] = None
     avg_latency_ms: Optional[int] = None
     group_id: Optional[int] = None
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # TASK LOG SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class TaskLogBase(BaseModel):
+class TaskLogBase(Schema):
     task_id: str
     agent_name: str
     business_unit: str
@@ -113,11 +125,13 @@ class TaskLogBase(BaseModel):
     request_payload: str
 
 class TaskLogCreate(TaskLogBase):
+    session_id: Optional[str] = None
+    agent_names: Optional[List[str]] = None
     parent_task_id: Optional[str] = None
     depth: int = 0
     delegated_by: Optional[str] = None
 
-class TaskLogUpdate(BaseModel):
+class TaskLogUpdate(Schema):
     status: str
     response_payload: Optional[str] = None
     duration_ms: Optional[int] = None
@@ -136,42 +150,44 @@ class TaskLog(TaskLogBase):
     fallback_model_used: Optional[str] = None
     token_usage: Optional[int] = None
     estimated_cost: Optional[float] = None
+    session_id: Optional[str] = None
+    agent_names: Optional[List[str]] = None
     parent_task_id: Optional[str] = None
     depth: int = 0
     delegated_by: Optional[str] = None
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # SCHEDULED TASK SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class ScheduledTaskCreate(BaseModel):
+class ScheduledTaskCreate(Schema):
     name: str
     description: Optional[str] = None
     task_description: str
     cron_expression: Optional[str] = None
     scheduled_at: Optional[datetime] = None
-    assigned_agents: str = "[]"         # JSON array
+    assigned_agents: Json[List[str]] = []   # Sent as a JSON string, stored natively
     auto_route: int = 1
-    required_skills: str = "[]"
-    required_tools: str = "[]"
+    required_skills: Json[List[str]] = []
+    required_tools: Json[List[str]] = []
     repeat_count: int = 0
     created_by: str = "system"
 
-class ScheduledTaskUpdate(BaseModel):
+class ScheduledTaskUpdate(Schema):
     name: Optional[str] = None
     description: Optional[str] = None
     task_description: Optional[str] = None
     cron_expression: Optional[str] = None
     scheduled_at: Optional[datetime] = None
-    assigned_agents: Optional[str] = None
+    assigned_agents: Optional[Json[List[str]]] = None
     auto_route: Optional[int] = None
-    required_skills: Optional[str] = None
-    required_tools: Optional[str] = None
+    required_skills: Optional[Json[List[str]]] = None
+    required_tools: Optional[Json[List[str]]] = None
     status: Optional[str] = None
     repeat_count: Optional[int] = None
 
-class ScheduledTask(BaseModel):
+class ScheduledTask(Schema):
     id: int
     name: str
     description: Optional[str] = None
@@ -181,60 +197,60 @@ class ScheduledTask(BaseModel):
     next_run_at: Optional[datetime] = None
     last_run_at: Optional[datetime] = None
     last_task_id: Optional[str] = None
-    assigned_agents: str = "[]"
+    assigned_agents: List[str] = []
     auto_route: int = 1
-    required_skills: str = "[]"
-    required_tools: str = "[]"
+    required_skills: List[str] = []
+    required_tools: List[str] = []
     status: str = "active"
     repeat_count: int = 0
     runs_completed: int = 0
     created_by: str = "system"
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # WORKFLOW SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class WorkflowStepCreate(BaseModel):
+class WorkflowStepCreate(Schema):
     step_order: int
     name: str
     step_type: str                      # "agent", "tool", "skill", "condition", "delay"
-    config: str = "{}"                  # JSON
+    config: Json[Dict[str, Any]] = {}   # Sent as a JSON string, stored natively
     on_success: str = "next"
     on_failure: str = "abort"
 
-class WorkflowStepUpdate(BaseModel):
+class WorkflowStepUpdate(Schema):
     step_order: Optional[int] = None
     name: Optional[str] = None
     step_type: Optional[str] = None
-    config: Optional[str] = None
+    config: Optional[Json[Dict[str, Any]]] = None
     on_success: Optional[str] = None
     on_failure: Optional[str] = None
 
-class WorkflowStep(BaseModel):
+class WorkflowStep(Schema):
     id: int
     workflow_id: int
     step_order: int
     name: str
     step_type: str
-    config: str = "{}"
+    config: Dict[str, Any] = {}
     on_success: str = "next"
     on_failure: str = "abort"
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
-class WorkflowCreate(BaseModel):
+class WorkflowCreate(Schema):
     name: str
     description: Optional[str] = None
     steps: List[WorkflowStepCreate] = []
     created_by: str = "system"
 
-class WorkflowUpdate(BaseModel):
+class WorkflowUpdate(Schema):
     name: Optional[str] = None
     description: Optional[str] = None
     is_active: Optional[int] = None
 
-class Workflow(BaseModel):
+class Workflow(Schema):
     id: int
     name: str
     description: Optional[str] = None
@@ -243,13 +259,13 @@ class Workflow(BaseModel):
     created_at: datetime
     updated_at: datetime
     steps: List[WorkflowStep] = []
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # AGENT KNOWLEDGE SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class AgentKnowledgeCreate(BaseModel):
+class AgentKnowledgeCreate(Schema):
     agent_name: str
     knowledge_type: str                 # "skill_result", "tool_usage", "pattern", "preference", "fact"
     topic: str
@@ -257,7 +273,7 @@ class AgentKnowledgeCreate(BaseModel):
     confidence: float = 0.8
     source_task_id: Optional[str] = None
 
-class AgentKnowledge(BaseModel):
+class AgentKnowledge(Schema):
     id: int
     agent_name: str
     knowledge_type: str
@@ -268,61 +284,61 @@ class AgentKnowledge(BaseModel):
     usage_count: int = 0
     last_used_at: Optional[datetime] = None
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # AGENT MESSAGE SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class AgentMessageCreate(BaseModel):
+class AgentMessageCreate(Schema):
     message_id: str
     session_id: str
     task_id: str
     sender_agent: str
     receiver_agent: str
     message_type: str
-    content: str
-    metadata_json: Optional[str] = None
+    content: Dict[str, Any]
+    metadata_json: Optional[Dict[str, Any]] = None
 
 class AgentMessage(AgentMessageCreate):
     id: int
     status: str = "pending"
     timestamp: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # AGENT STATE SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class AgentStateCreate(BaseModel):
+class AgentStateCreate(Schema):
     task_id: str
     agent_name: str
     max_steps: int = 10
 
-class AgentStateUpdate(BaseModel):
+class AgentStateUpdate(Schema):
     current_step: Optional[int] = None
     status: Optional[str] = None
-    reasoning_trace: Optional[str] = None
-    scratchpad: Optional[str] = None
+    reasoning_trace: Optional[List[Any]] = None
+    scratchpad: Optional[Dict[str, Any]] = None
 
-class AgentState(BaseModel):
+class AgentState(Schema):
     id: int
     task_id: str
     agent_name: str
     current_step: int
     max_steps: int
     status: str
-    reasoning_trace: str
-    scratchpad: str
+    reasoning_trace: List[Any] = []
+    scratchpad: Dict[str, Any] = {}
     created_at: datetime
     updated_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # AUTH SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class RoleBase(BaseModel):
+class RoleBase(Schema):
     name: str
 
 class RoleCreate(RoleBase):
@@ -330,9 +346,9 @@ class RoleCreate(RoleBase):
 
 class Role(RoleBase):
     id: int
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
-class UserBase(BaseModel):
+class UserBase(Schema):
     username: str
 
 class UserCreate(UserBase):
@@ -342,13 +358,13 @@ class UserCreate(UserBase):
 class User(UserBase):
     id: int
     role: Role
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # MEMORY SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class MemoryBase(BaseModel):
+class MemoryBase(Schema):
     agent_name: str
     session_id: str
     role: str
@@ -360,31 +376,31 @@ class MemoryCreate(MemoryBase):
 class Memory(MemoryBase):
     id: int
     timestamp: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ORM_CONFIG
 
 # ═══════════════════════════════════════════════════════════════════════
 # ANALYTICS SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class KPIStats(BaseModel):
+class KPIStats(Schema):
     tasks_today: int
     cost_today: float
     success_rate: float
 
-class AgentUsage(BaseModel):
+class AgentUsage(Schema):
     agent_name: str
     task_count: int
 
-class StatusDistribution(BaseModel):
+class StatusDistribution(Schema):
     status: str
     count: int
 
-class DailyVolume(BaseModel):
+class DailyVolume(Schema):
     date: date
     task_count: int
-    model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True)
+    model_config = ORM_CONFIG
 
-class AnalyticsData(BaseModel):
+class AnalyticsData(Schema):
     kpis: KPIStats
     agent_usage: List[AgentUsage]
     status_distribution: List[StatusDistribution]
@@ -394,20 +410,20 @@ class AnalyticsData(BaseModel):
 # ORCHESTRATOR SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class SubTaskPlan(BaseModel):
+class SubTaskPlan(Schema):
     sub_task_description: str
     target_agent: str
     priority: int = 1
     depends_on: List[str] = []
 
-class OrchestrationPlan(BaseModel):
+class OrchestrationPlan(Schema):
     original_task: str
     is_complex: bool
     reasoning: str
     sub_tasks: List[SubTaskPlan] = []
     direct_tool: Optional[str] = None
 
-class OrchestrationResult(BaseModel):
+class OrchestrationResult(Schema):
     task_id: str
     status: str
     summary: str
@@ -418,15 +434,47 @@ class OrchestrationResult(BaseModel):
 # OPENCLAW EXECUTOR SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════
 
-class OpenClawCallbackRequest(BaseModel):
+class OpenClawCallbackRequest(Schema):
     task_id: str
     status: str
     result: Dict[str, Any]
     agent_name: str
     execution_trace: List[Dict[str, Any]] = []
 
-class OpenClawSessionState(BaseModel):
+class OpenClawSessionState(Schema):
     session_id: str
     task_id: str
     status: str
     messages: List[Dict[str, Any]] = []
+
+# ═══════════════════════════════════════════════════════════════════════
+# TRUSTED ORM CONVERSION
+# ═══════════════════════════════════════════════════════════════════════
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+@lru_cache(maxsize=None)
+def _construct_plan(model: Type[BaseModel]) -> Tuple[Tuple[str, Optional[Type[BaseModel]], bool], ...]:
+    """(field, nested model or None, is_list) per field, worked out once per model."""
+    plan = []
+    for name, field in model.model_fields.items():
+        annotation, many = field.annotation, False
+        if get_origin(annotation) in (list, List):
+            annotation, many = get_args(annotation)[0], True
+        nested = annotation if isinstance(annotation, type) and issubclass(annotation, BaseModel) else None
+        plan.append((name, nested, many))
+    return tuple(plan)
+
+def construct_from_orm(model: Type[ModelT], obj) -> ModelT:
+    """
+    model_construct from an ORM object our own DB produced: no per-field
+    validation, nested models (Agent.tools, User.role) built the same way.
+    Only for trusted rows; anything client-supplied goes through model_validate.
+    """
+    values = {}
+    for name, nested, many in _construct_plan(model):
+        value = getattr(obj, name)
+        if nested is not None and value is not None:
+            value = [construct_from_orm(nested, v) for v in value] if many else construct_from_orm(nested, value)
+        values[name] = value
+    return model.model_construct(**values)
@@ -16,25 +16,66 @@ The LLM is used for:
 4. Result summarization
 """
 
-import json
+import functools
+import importlib
 import os
 import re
-import random
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 
-# Attempt to import LLM provider libraries (graceful degradation)
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+import orjson
 
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# A markdown code fence around the JSON reply (the closing fence may be cut off)
+_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)(?:\s*```)?$", re.DOTALL)
+
+
+def _import_provider(module: str):
+    """
+    Import an LLM provider library on demand (graceful degradation: None if not
+    installed). Only the configured provider is ever imported; google.generativeai
+    alone pulls in gRPC and protobuf.
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        return None
+
+
+# Mock-mode keyword maps. Each one is matched with a single alternation regex, so a
+# prompt is scanned once rather than once per keyword.
+_MOCK_DOMAINS = {
+    "recruitment": ("Recruitment Agent", "Handle recruitment-related aspects"),
+    "hiring": ("Recruitment Agent", "Handle hiring-related aspects"),
+    "resume": ("Recruitment Agent", "Analyze resumes"),
+    "candidate": ("Recruitment Agent", "Evaluate candidates"),
+    "inventory": ("Manufacturing Optimization Agent", "Check inventory levels"),
+    "manufacturing": ("Manufacturing Optimization Agent", "Optimize manufacturing processes"),
+    "supply": ("Manufacturing Optimization Agent", "Analyze supply chain"),
+    "forecast": ("Finance Automation Agent", "Generate financial forecasts"),
+    "finance": ("Finance Automation Agent", "Handle financial analysis"),
+    "invoice": ("Finance Automation Agent", "Process invoices"),
+    "audit": ("Finance Automation Agent", "Perform audit checks"),
+    "compliance": ("Compliance Officer", "Review compliance requirements"),
+    "report": ("Compliance Officer", "Generate compliance reports"),
+    "email": ("Compliance Officer", "Send email notifications"),
+}
+_MOCK_DOMAINS_RE = re.compile("|".join(map(re.escape, _MOCK_DOMAINS)))
+
+_MOCK_TOOLS = {
+    "inventory": ("inventory_check", {"business_unit": "Global Operations"}),
+    "stock": ("inventory_check", {"business_unit": "Global Operations"}),
+    "demand": ("demand_forecasting", {}),
+    "forecast": ("financial_forecasting", {}),
+    "invoice": ("invoice_processing", {}),
+    "audit": ("audit_log_check", {}),
+    "resume": ("resume_analysis", {"candidate_name": "Candidate"}),
+    "candidate": ("candidate_ranking", {}),
+    "email": ("email_sender", {"recipient": "admin@enterprise.com", "subject": "Notification"}),
+    "report": ("report_generator", {"report_name": "Enterprise Report"}),
+}
+_MOCK_TOOLS_RE = re.compile("|".join(map(re.escape, _MOCK_TOOLS)))
 
 
 class LLMClient:
@@ -53,13 +94,24 @@ class LLMClient:
         self.default_provider = os.getenv("LLM_PROVIDER", "mock")  # "gemini", "openai", "mock"
         self.total_tokens_used = 0
         self.total_cost = 0.0
+        # Guards the usage totals and the response cache; never held across a provider call
+        self._lock = threading.Lock()
+
+        # Opt-in LRU of responses by (provider, prompt) for retries and replays of the
+        # same prompt. Off by default: real providers don't answer deterministically.
+        self.cache_size = int(os.getenv("LLM_CACHE_SIZE", "0"))
+        self._response_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+        self.genai = None
+        self.openai_client = None
 
         # Initialize providers
-        if GEMINI_AVAILABLE and self.google_api_key:
+        if self.google_api_key and (genai := _import_provider("google.generativeai")):
             genai.configure(api_key=self.google_api_key)
+            self.genai = genai
             self.default_provider = "gemini"
             print("[LLM] Initialized Google Gemini provider")
-        elif OPENAI_AVAILABLE and self.openai_api_key:
+        elif self.openai_api_key and (openai := _import_provider("openai")):
             self.openai_client = openai.OpenAI(api_key=self.openai_api_key)
             self.default_provider = "openai"
             print("[LLM] Initialized OpenAI provider")
@@ -90,12 +142,7 @@ class LLMClient:
         start_time = time.time()
 
         try:
-            if selected_provider == "gemini" and GEMINI_AVAILABLE and self.google_api_key:
-                result = self._call_gemini(prompt)
-            elif selected_provider == "openai" and OPENAI_AVAILABLE and self.openai_api_key:
-                result = self._call_openai(prompt)
-            else:
-                result = self._call_mock(prompt)
+            result = self._call_cached(selected_provider, prompt)
         except Exception as e:
             print(f"[LLM] Error with provider '{selected_provider}': {e}")
             # Fallback to mock
@@ -104,7 +151,8 @@ class LLMClient:
             selected_provider = "mock (fallback)"
 
         latency_ms = int((time.time() - start_time) * 1000)
-        tokens = result.pop("_tokens", random.randint(200, 1500))
+        # Providers that don't report usage (and mock mode) get the ~4 chars/token estimate
+        tokens = result.pop("_tokens", len(prompt) >> 2)
         cost = round(tokens * 0.00003, 4)
 
         result["_provider"] = selected_provider
@@ -112,8 +160,9 @@ class LLMClient:
         result["_cost"] = cost
         result["_latency_ms"] = latency_ms
 
-        self.total_tokens_used += tokens
-        self.total_cost += cost
+        with self._lock:
+            self.total_tokens_used += tokens
+            self.total_cost += cost
 
         return result
 
@@ -125,7 +174,7 @@ class LLMClient:
         prompt = f"""You are a Task Orchestrator. Analyze the following task and determine 
 if it is complex enough to require multiple agents, or if a single agent can handle it.
 
-Available specialized agents: {json.dumps(available_agents)}
+Available specialized agents: {orjson.dumps(available_agents).decode()}
 
 Task: {task}
 
@@ -152,23 +201,52 @@ Respond with JSON:
 Original task: {task}
 
 Results:
-{json.dumps(results, indent=2)}
+{orjson.dumps(results, option=orjson.OPT_INDENT_2).decode()}
 
 Provide a clear, concise summary that addresses the original task.
 Respond with JSON: {{"summary": "your summary here"}}
 """
         result = self.generate_decision(prompt)
-        return result.get("summary", result.get("final_answer", json.dumps(results)))
+        if "summary" in result:
+            return result["summary"]
+        if "final_answer" in result:
+            return result["final_answer"]
+        return orjson.dumps(results).decode()
 
     # ------------------------------------------------------------------
     # PROVIDER IMPLEMENTATIONS
     # ------------------------------------------------------------------
+    def _call_cached(self, provider: str, prompt: str) -> Dict[str, Any]:
+        """Dispatch to the provider, through the response cache when it's enabled."""
+        if self.cache_size <= 0:
+            return self._call_provider(provider, prompt)
+        key = (provider, prompt)
+        with self._lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+        if cached is not None:
+            return {**cached, "_tokens": 0}  # Already counted when it was first generated
+        result = self._call_provider(provider, prompt)
+        with self._lock:
+            self._response_cache[key] = dict(result)
+            if len(self._response_cache) > self.cache_size:
+                self._response_cache.popitem(last=False)
+        return result
+
+    def _call_provider(self, provider: str, prompt: str) -> Dict[str, Any]:
+        if provider == "gemini" and self.genai:
+            return self._call_gemini(prompt)
+        if provider == "openai" and self.openai_client:
+            return self._call_openai(prompt)
+        return self._call_mock(prompt)
+
     def _call_gemini(self, prompt: str) -> Dict[str, Any]:
         """Call Google Gemini API."""
-        model = genai.GenerativeModel("gemini-2.5-pro")
+        model = self.genai.GenerativeModel("gemini-2.5-pro")
         response = model.generate_content(
             prompt,
-            generation_config=genai.GenerationConfig(
+            generation_config=self.genai.GenerationConfig(
                 response_mime_type="application/json",
                 temperature=0.2,
             ),
@@ -203,7 +281,6 @@ Respond with JSON: {{"summary": "your summary here"}}
         if "summarize" in prompt_lower:
             return {
                 "summary": "Task completed successfully. All sub-tasks have been processed by their respective agents.",
-                "_tokens": random.randint(100, 300),
             }
 
         # --- ReAct Decision Mock ---
@@ -211,27 +288,13 @@ Respond with JSON: {{"summary": "your summary here"}}
 
     def _mock_decomposition(self, prompt_lower: str) -> Dict[str, Any]:
         """Mock task decomposition logic."""
-        # Check for multi-domain tasks
+        # Check for multi-domain tasks (one agent per domain, in map order)
+        matched = set(_MOCK_DOMAINS_RE.findall(prompt_lower))
         domains_found = []
-        domain_map = {
-            "recruitment": ("Recruitment Agent", "Handle recruitment-related aspects"),
-            "hiring": ("Recruitment Agent", "Handle hiring-related aspects"),
-            "resume": ("Recruitment Agent", "Analyze resumes"),
-            "candidate": ("Recruitment Agent", "Evaluate candidates"),
-            "inventory": ("Manufacturing Optimization Agent", "Check inventory levels"),
-            "manufacturing": ("Manufacturing Optimization Agent", "Optimize manufacturing processes"),
-            "supply": ("Manufacturing Optimization Agent", "Analyze supply chain"),
-            "forecast": ("Finance Automation Agent", "Generate financial forecasts"),
-            "finance": ("Finance Automation Agent", "Handle financial analysis"),
-            "invoice": ("Finance Automation Agent", "Process invoices"),
-            "audit": ("Finance Automation Agent", "Perform audit checks"),
-            "compliance": ("Compliance Officer", "Review compliance requirements"),
-            "report": ("Compliance Officer", "Generate compliance reports"),
-            "email": ("Compliance Officer", "Send email notifications"),
-        }
-
-        for keyword, (agent, desc) in domain_map.items():
-            if keyword in prompt_lower and agent not in [d[0] for d in domains_found]:
+        agents_found = set()
+        for keyword, (agent, desc) in _MOCK_DOMAINS.items():
+            if keyword in matched and agent not in agents_found:
+                agents_found.add(agent)
                 domains_found.append((agent, f"{desc} for this task"))
 
         if len(domains_found) >= 2:
@@ -242,7 +305,6 @@ Respond with JSON: {{"summary": "your summary here"}}
                     {"sub_task_description": desc, "target_agent": agent, "priority": i + 1}
                     for i, (agent, desc) in enumerate(domains_found)
                 ],
-                "_tokens": random.randint(300, 800),
             }
         elif len(domains_found) == 1:
             return {
@@ -250,7 +312,6 @@ Respond with JSON: {{"summary": "your summary here"}}
                 "reasoning": "Task can be handled by a single specialized agent.",
                 "direct_agent": domains_found[0][0],
                 "sub_tasks": [],
-                "_tokens": random.randint(200, 400),
             }
         else:
             return {
@@ -258,33 +319,19 @@ Respond with JSON: {{"summary": "your summary here"}}
                 "reasoning": "General task, routing to General Assistant.",
                 "direct_agent": "General Assistant",
                 "sub_tasks": [],
-                "_tokens": random.randint(100, 300),
             }
 
     def _mock_react_decision(self, prompt_lower: str) -> Dict[str, Any]:
         """Mock ReAct-style decision logic."""
-        # Tool selection based on keywords
-        tool_keywords = {
-            "inventory": ("inventory_check", {"business_unit": "Global Operations"}),
-            "stock": ("inventory_check", {"business_unit": "Global Operations"}),
-            "demand": ("demand_forecasting", {}),
-            "forecast": ("financial_forecasting", {}),
-            "invoice": ("invoice_processing", {}),
-            "audit": ("audit_log_check", {}),
-            "resume": ("resume_analysis", {"candidate_name": "Candidate"}),
-            "candidate": ("candidate_ranking", {}),
-            "email": ("email_sender", {"recipient": "admin@enterprise.com", "subject": "Notification"}),
-            "report": ("report_generator", {"report_name": "Enterprise Report"}),
-        }
-
-        for keyword, (tool_name, params) in tool_keywords.items():
-            if keyword in prompt_lower:
+        # Tool selection based on keywords (first in map order wins)
+        matched = set(_MOCK_TOOLS_RE.findall(prompt_lower))
+        for keyword, (tool_name, params) in _MOCK_TOOLS.items():
+            if keyword in matched:
                 return {
                     "thought": f"The task involves '{keyword}', which maps to the '{tool_name}' tool.",
                     "action": "use_tool",
                     "tool_name": tool_name,
-                    "parameters": params,
-                    "_tokens": random.randint(200, 600),
+                    "parameters": dict(params),  # Fresh copy: callers may fill it in
                 }
 
         # Check if there's reasoning history suggesting we should give final answer
@@ -293,7 +340,6 @@ Respond with JSON: {{"summary": "your summary here"}}
                 "thought": "I have gathered enough information from previous steps. Time to provide the final answer.",
                 "action": "final_answer",
                 "final_answer": "Task has been processed successfully based on the gathered information.",
-                "_tokens": random.randint(150, 400),
             }
 
         # Default: general chat
@@ -301,7 +347,6 @@ Respond with JSON: {{"summary": "your summary here"}}
             "thought": "This is a general query. I'll provide a helpful response.",
             "action": "final_answer",
             "final_answer": "I can help you with enterprise tasks including recruitment, manufacturing, finance, and compliance. Please specify what you need!",
-            "_tokens": random.randint(100, 300),
         }
 
     # ------------------------------------------------------------------
@@ -312,11 +357,10 @@ Respond with JSON: {{"summary": "your summary here"}}
         text = text.strip()
         # Strip markdown code blocks if present
         if text.startswith("```"):
-            text = re.sub(r"^```(?:json)?\s*", "", text)
-            text = re.sub(r"\s*```$", "", text)
+            text = _FENCE_RE.match(text).group(1)
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
             return {
                 "thought": "Failed to parse LLM response as JSON.",
                 "action": "final_answer",
@@ -324,12 +368,15 @@ Respond with JSON: {{"summary": "your summary here"}}
             }
 
     def get_usage_stats(self) -> Dict[str, Any]:
-        return {
-            "total_tokens": self.total_tokens_used,
-            "total_cost": self.total_cost,
-            "provider": self.default_provider,
-        }
+        with self._lock:
+            return {
+                "total_tokens": self.total_tokens_used,
+                "total_cost": self.total_cost,
+                "provider": self.default_provider,
+            }
 
 
-# Singleton
-llm_client = LLMClient()
+@functools.lru_cache(maxsize=1)
+def get_llm_client() -> LLMClient:
+    """The process-wide client, built on first use rather than at import."""
+    return LLMClient()
@@ -1,9 +1,10 @@
 """
 Background Worker — Agentic Task Processor
 =============================================
-Listens on Redis 'task_queue' and processes tasks using the full agentic pipeline:
+Reads the Redis stream 'task_stream' (consumer group 'workers') and processes
+tasks using the full agentic pipeline:
 
-1. Dequeue task from Redis
+1. Claim a batch of tasks from the stream (XREADGROUP), ack each once handled
 2. Route through the Orchestrator (which decomposes → delegates → aggregates)
 3. The Orchestrator uses the Execution Loop (ReAct: Think → Act → Observe)
 4. Agents communicate via the Communication Bus
@@ -12,53 +13,209 @@ Listens on Redis 'task_queue' and processes tasks using the full agentic pipelin
 Optionally delivers results back to OpenClaw via callback URL.
 """
 
+import logging
+import multiprocessing
 import redis
-import json
+import orjson
+import queue
+import threading
 import time
-import sys
+import signal
 import os
-import random
+import socket
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from requests.adapters import HTTPAdapter
 from sqlalchemy.orm import Session
-
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from urllib3.util.retry import Retry
 
 from enterprise_core.app import crud, schemas
 from enterprise_core.app.database import SessionLocal
 from enterprise_core.app.core.orchestrator import orchestrator
 from enterprise_core.app.core.execution_loop import execution_loop
 from enterprise_core.app.core.communication import comm_bus
+from common.events import EVENT_STREAM, add_event
 from common.tools import tool_registry
 
-redis_conn = redis.Redis.from_url("redis://redis:6379/0", decode_responses=True)
-print("=" * 60)
-print("  GENi Worker v2.0 — Agentic Task Processor")
-print("  Listening for tasks on 'task_queue'...")
-print("=" * 60)
+# One pool shared by the task loop, the event publisher thread and callback
+# threads. Idle connections are kept alive with TCP probes and PINGed before
+# reuse once idle for 30s, so a connection a proxy or NAT dropped is replaced
+# rather than failing the next command.
+_TCP_KEEPALIVE = {
+    getattr(socket, opt): value
+    for opt, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, opt)
+}
+_redis_pool = redis.ConnectionPool.from_url(
+    "redis://redis:6379/0",
+    decode_responses=True,
+    max_connections=64,
+    socket_keepalive=True,
+    socket_keepalive_options=_TCP_KEEPALIVE,
+    health_check_interval=30,
+)
+redis_conn = redis.Redis(connection_pool=_redis_pool)
+
+# Task stream consumed through a consumer group: each entry goes to exactly one
+# worker and stays in the group's pending list until that worker XACKs it (and
+# then XDELs it: the stream is not trimmed by length, which could drop entries
+# that were never delivered).
+TASK_STREAM = "task_stream"
+TASK_GROUP = "workers"
+# Entry ID -> task_id for entries handed to a consumer and not yet acked, so an
+# entry whose fields are gone by the time it is re-read can still fail its task
+TASK_INFLIGHT = "task_stream:inflight"
+# Stable per container, so a restarted worker picks its own unacked tasks back up
+WORKER_ID = os.getenv("WORKER_ID") or socket.gethostname()
+# Worker processes per container, each its own consumer (WORKER_ID-<n>). With
+# several, each reads one entry at a time so a slow task doesn't hold a batch
+# of others hostage while sibling processes sit idle. Every process has its own
+# DB pool (DB_POOL_SIZE + DB_MAX_OVERFLOW connections), so size the two together
+# against Postgres max_connections.
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "1"))
+READ_COUNT = int(os.getenv("TASK_READ_COUNT", "32" if WORKER_CONCURRENCY == 1 else "1"))
+READ_BLOCK_MS = 1000
+# Tasks left unacked this long by another (presumably dead) consumer are taken over
+CLAIM_IDLE_MS = int(os.getenv("TASK_CLAIM_IDLE_MS", str(30 * 60 * 1000)))
+
+# Records are queued; a background thread does the stdout I/O, so a slow log
+# consumer never stalls a task (same setup as the API's "geni" logger)
+log = logging.getLogger("geni.worker")
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue: queue.Queue = queue.Queue(-1)
+log.addHandler(QueueHandler(_log_queue))
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+_log_listener = QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+
+log.info("GENi Worker v2.0 — Agentic Task Processor")
+log.info("Consuming '%s' as %s/%s...", TASK_STREAM, TASK_GROUP, WORKER_ID)
 
 # ---------------------------------------------------------------------------
 # EVENT EMITTER
 # ---------------------------------------------------------------------------
+# Events are handed to a single publisher thread instead of being published
+# inline, so a task never waits on a Redis round trip to report progress. One
+# thread keeps them in emit order; it sends whatever has piled up (up to
+# EVENT_BATCH) in one pipeline. Progress events are droppable: when Redis falls
+# behind and the queue fills, new ones are dropped rather than stalling tasks.
+# A task's final status is not, since SSE clients wait on it to close: it waits
+# up to EVENT_PUT_TIMEOUT for room, then is published directly.
+EVENT_QUEUE_SIZE = 10_000
+EVENT_BATCH = 128
+EVENT_PUT_TIMEOUT = 5
+_event_q: "queue.Queue[tuple]" = queue.Queue(EVENT_QUEUE_SIZE)
+_dropped_events = 0
+
+def _publish(channel: str, event: dict, required: bool = False):
+    global _dropped_events
+    payload = orjson.dumps(event)
+    try:
+        if required:
+            _event_q.put((channel, payload), timeout=EVENT_PUT_TIMEOUT)
+        else:
+            _event_q.put_nowait((channel, payload))
+    except queue.Full:
+        if required:
+            try:
+                redis_conn.publish(channel, payload)
+            except Exception as e:
+                log.error("Failed to publish to '%s': %s", channel, e)
+            return
+        _dropped_events += 1
+        if _dropped_events % 1000 == 1:
+            log.warning("Event queue full, %d events dropped so far", _dropped_events)
+
+def _publisher_loop():
+    while True:
+        events = [_event_q.get()]
+        try:
+            while len(events) < EVENT_BATCH:
+                events.append(_event_q.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            with redis_conn.pipeline(transaction=False) as pipe:
+                for channel, payload in events:
+                    if channel == EVENT_STREAM:
+                        add_event(pipe, payload)
+                    else:
+                        pipe.publish(channel, payload)
+                pipe.execute()
+        except Exception as e:
+            log.warning("Failed to publish %d events: %s", len(events), e)
+        for _ in events:
+            _event_q.task_done()
+
+threading.Thread(target=_publisher_loop, name="event-publisher", daemon=True).start()
+
 def emit_event(event_type: str, data: dict):
-    """Publishes a structured event to the Redis Pub/Sub event bus."""
-    event = {
+    """
+    Queues a structured event for the 'events' stream (see common/events.py).
+    """
+    _publish(EVENT_STREAM, {
         "event_type": event_type,
         "timestamp": time.time(),
         **data
-    }
-    redis_conn.publish("events", json.dumps(event))
-    print(f"[EVENT] {event_type}: task_id={data.get('task_id', 'N/A')}")
+    })
+    log.info("[EVENT] %s: task_id=%s", event_type, data.get("task_id", "N/A"))
+
+def publish_task_update(task_id: str, status: str, **data):
+    """
+    Queues a status transition for the per-task channel read by the SSE stream
+    endpoint. Anything past "running" is a final status and is never dropped.
+    """
+    _publish(f"task:{task_id}:updates", {
+        "task_id": task_id,
+        "status": status,
+        **data
+    }, required=status != "running")
 
 # ---------------------------------------------------------------------------
 # OPENCLAW CALLBACK DELIVERY
 # ---------------------------------------------------------------------------
-def deliver_callback(callback_url: str, task_id: str, result: dict):
+# Callbacks mostly go to the same OpenClaw host, so keep connections alive in a
+# shared pool instead of paying a TCP+TLS handshake per task. Retry only covers
+# failures before the request is sent (urllib3 never resends a POST once it went
+# out), so a callback is never delivered twice.
+_http = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.2),
+)
+_http.mount("http://", _http_adapter)
+_http.mount("https://", _http_adapter)
+# Delivery runs off the task loop, so a slow OpenClaw host never delays the next task
+_callback_pool = ThreadPoolExecutor(max_workers=int(os.getenv("CALLBACK_POOL", "16")), thread_name_prefix="callback")
+
+# The bulk of a result, by far. Both the stored response_payload and the callback
+# body carry them, so they are encoded once and spliced into each document.
+_LARGE_RESULT_FIELDS = ("execution_trace", "sub_task_results")
+
+def _encode_large_fields(result: dict) -> dict:
+    return {k: orjson.dumps(result[k], option=orjson.OPT_NON_STR_KEYS) for k in _LARGE_RESULT_FIELDS if k in result}
+
+def _dumps_with_encoded(obj: dict, encoded: dict) -> bytes:
+    """orjson-encode `obj` with extra members whose values are already-encoded JSON."""
+    body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)[:-1]
+    for key, value in encoded.items():
+        body += (b"," if len(body) > 1 else b"") + orjson.dumps(key) + b":" + value
+    return body + b"}"
+
+def deliver_callback(callback_url: str, task_id: str, result: dict, encoded: dict = None):
     """
     Deliver task results back to OpenClaw via HTTP callback.
     This enables OpenClaw to act as a true executor, receiving results
-    asynchronously and presenting them to the user.
+    asynchronously and presenting them to the user. `encoded` holds the
+    result's large fields as returned by _encode_large_fields, if already done.
     """
     try:
+        if encoded is None:
+            encoded = _encode_large_fields(result)
         payload = {
             "task_id": task_id,
             "status": result.get("status", "unknown"),
@@ -70,17 +227,15 @@ def deliver_callback(callback_url: str, task_id: str, result: dict):
             "token_usage": result.get("token_usage", 0),
             "estimated_cost": result.get("estimated_cost", 0.0),
             "total_duration_ms": result.get("total_duration_ms", 0),
-            "execution_trace": result.get("execution_trace", []),
-            "sub_task_results": result.get("sub_task_results", []),
         }
         
-        response = requests.post(
+        response = _http.post(
             callback_url,
-            json=payload,
+            data=_dumps_with_encoded(payload, {k: encoded.get(k, b"[]") for k in _LARGE_RESULT_FIELDS}),
             headers={"Content-Type": "application/json"},
-            timeout=10,
+            timeout=(3, 7),
         )
-        print(f"[CALLBACK] Delivered result to {callback_url} — status: {response.status_code}")
+        log.info("[CALLBACK] Delivered result to %s — status: %s", callback_url, response.status_code)
         
         emit_event("OPENCLAW_CALLBACK_SENT", {
             "task_id": task_id,
@@ -88,7 +243,7 @@ def deliver_callback(callback_url: str, task_id: str, result: dict):
             "http_status": response.status_code,
         })
     except Exception as e:
-        print(f"[CALLBACK] Failed to deliver to {callback_url}: {e}")
+        log.warning("[CALLBACK] Failed to deliver to %s: %s", callback_url, e)
         emit_event("OPENCLAW_CALLBACK_FAILED", {
             "task_id": task_id,
             "callback_url": callback_url,
@@ -98,157 +253,308 @@ def deliver_callback(callback_url: str, task_id: str, result: dict):
 # ---------------------------------------------------------------------------
 # MAIN WORKER LOOP
 # ---------------------------------------------------------------------------
-def get_db():
-    db = SessionLocal()
+def process_job(db: Session, job: dict):
+    """Run one dequeued task end to end: events, orchestration, persistence, callback."""
+    start_time = time.time()
+    task_id = job.get("task_id")
+    persona_name = job.get("persona_name", "Auto")
+    task_description = job.get("task", "")
+    tenant_id = job.get("tenant_id", "default")
+    session_id = job.get("session_id", "")
+    source = job.get("source", "dashboard")
+    use_orchestrator = job.get("use_orchestrator", True)
+    callback_url = job.get("callback_url")
+    initiator = job.get("initiator", "")
+
+    log.info(
+        "[TASK] Processing task_id=%s persona=%s source=%s task=%.100s",
+        task_id, persona_name, source, task_description,
+    )
+
+    # --- EMIT: TASK_STARTED ---
+    emit_event("TASK_STARTED", {
+        "task_id": task_id,
+        "persona_name": persona_name,
+        "tenant_id": tenant_id,
+        "source": source,
+    })
+    publish_task_update(task_id, "running")
+
     try:
-        yield db
-    finally:
-        db.close()
+        # --- PROCESS TASK VIA ORCHESTRATOR ---
+        if use_orchestrator:
+            result = orchestrator.process_task(
+                db=db,
+                task_id=task_id,
+                task_description=task_description,
+                persona_name=persona_name,
+                tenant_id=tenant_id,
+                session_id=session_id,
+                source=source,
+            )
+        else:
+            # Legacy: direct execution without orchestrator
+            result = execution_loop.execute(
+                db=db,
+                task_id=task_id,
+                task_description=task_description,
+                persona_name=persona_name,
+                tenant_id=tenant_id,
+            )
 
-def main():
-    while True:
-        db_gen = get_db()
-        db = next(db_gen)
+        duration_ms = int((time.time() - start_time) * 1000)
+        status = result.get("status", "success")
+        agent_name = result.get("agent_name", persona_name)
+        execution_mode = result.get("execution_mode", "single_agent")
+        sub_task_count = len(result.get("sub_task_results", ()))
+
+        # --- UPDATE DATABASE ---
+        encoded = _encode_large_fields(result)
+        log_update = schemas.TaskLogUpdate(
+            status=status,
+            response_payload=_dumps_with_encoded(
+                {k: v for k, v in result.items() if k not in encoded}, encoded,
+            ).decode(),
+            duration_ms=duration_ms,
+            primary_model_used=result.get("model_used", ""),
+            token_usage=result.get("token_usage", 0),
+            estimated_cost=result.get("estimated_cost", 0.0),
+        )
+        crud.update_task_log(db, task_id, log_update)
+
+        # --- EMIT: TASK_COMPLETED --- (after the write, so listeners that refetch see the result)
+        emit_event("TASK_COMPLETED", {
+            "task_id": task_id,
+            "status": status,
+            "execution_mode": execution_mode,
+            "agent_name": agent_name,
+            "duration_ms": duration_ms,
+            "sub_tasks": sub_task_count,
+        })
+        publish_task_update(task_id, status, duration_ms=duration_ms)
+
+        # Update agent activity timestamp
+        crud.update_agent_activity(db, agent_name)
+
+        log.info(
+            "[SUCCESS] Task '%s' completed in %dms mode=%s agent=%s sub_tasks=%d tokens=%s",
+            task_id, duration_ms,
+            execution_mode,
+            agent_name,
+            sub_task_count,
+            log_update.token_usage,
+        )
+
+        # --- DELIVER CALLBACK TO OPENCLAW ---
+        if callback_url:
+            _callback_pool.submit(deliver_callback, callback_url, task_id, result, encoded)
+
+        # --- STORE IN MEMORY (for conversation context) ---
+        if session_id:
+            try:
+                # Store the user message and the agent response in one insert
+                crud.create_memories_bulk(db, [
+                    schemas.MemoryCreate(
+                        agent_name=agent_name,
+                        session_id=session_id,
+                        role="user",
+                        content=task_description,
+                    ),
+                    schemas.MemoryCreate(
+                        agent_name=agent_name,
+                        session_id=session_id,
+                        role="agent",
+                        content=result.get("summary", result.get("final_answer", "")),
+                    ),
+                ])
+            except Exception as mem_err:
+                log.warning("Failed to store memory: %s", mem_err)
+
+    except Exception as e:
+        duration_ms = int((time.time() - start_time) * 1000)
+        error_message = str(e)
+
+        log_update = schemas.TaskLogUpdate(
+            status='failure',
+            response_payload=orjson.dumps({"error": error_message}).decode(),
+            duration_ms=duration_ms,
+        )
         try:
-            _, job_json = redis_conn.blpop("task_queue")
-            job = json.loads(job_json)
-            
-            start_time = time.time()
-            task_id = job.get("task_id")
-            persona_name = job.get("persona_name", "Auto")
-            task_description = job.get("task", "")
-            tenant_id = job.get("tenant_id", "default")
-            session_id = job.get("session_id", "")
-            source = job.get("source", "dashboard")
-            use_orchestrator = job.get("use_orchestrator", True)
-            callback_url = job.get("callback_url")
-            initiator = job.get("initiator", "")
-
-            print(f"\n{'─' * 60}")
-            print(f"[TASK] Processing task_id={task_id}")
-            print(f"  Persona: {persona_name}")
-            print(f"  Source:  {source}")
-            print(f"  Task:    {task_description[:100]}...")
-            print(f"{'─' * 60}")
-
-            # --- EMIT: TASK_STARTED ---
-            emit_event("TASK_STARTED", {
+            crud.update_task_log(db, task_id, log_update)
+        finally:
+            # --- EMIT: TASK_FAILED --- (even if the database is what failed)
+            emit_event("TASK_FAILED", {
                 "task_id": task_id,
-                "persona_name": persona_name,
-                "tenant_id": tenant_id,
-                "source": source,
+                "error": error_message,
             })
+            publish_task_update(task_id, "failure", duration_ms=duration_ms, error=error_message)
+        log.error("[FAILURE] Task '%s' failed: %s", task_id, error_message)
 
-            try:
-                # --- PROCESS TASK VIA ORCHESTRATOR ---
-                if use_orchestrator:
-                    result = orchestrator.process_task(
-                        db=db,
-                        task_id=task_id,
-                        task_description=task_description,
-                        persona_name=persona_name,
-                        tenant_id=tenant_id,
-                        session_id=session_id,
-                        source=source,
-                    )
-                else:
-                    # Legacy: direct execution without orchestrator
-                    result = execution_loop.execute(
-                        db=db,
-                        task_id=task_id,
-                        task_description=task_description,
-                        persona_name=persona_name,
-                        tenant_id=tenant_id,
-                    )
-
-                duration_ms = int((time.time() - start_time) * 1000)
-                status = result.get("status", "success")
-
-                # --- EMIT: TASK_COMPLETED ---
-                emit_event("TASK_COMPLETED", {
-                    "task_id": task_id,
-                    "status": status,
-                    "execution_mode": result.get("execution_mode", "single_agent"),
-                    "agent_name": result.get("agent_name", persona_name),
-                    "duration_ms": duration_ms,
-                    "sub_tasks": len(result.get("sub_task_results", [])),
-                })
-                
-                # --- UPDATE DATABASE ---
-                log_update = schemas.TaskLogUpdate(
-                    status=status,
-                    response_payload=json.dumps(result),
-                    duration_ms=duration_ms,
-                    primary_model_used=result.get("model_used", ""),
-                    token_usage=result.get("token_usage", 0),
-                    estimated_cost=result.get("estimated_cost", 0.0),
-                )
-                crud.update_task_log(db, task_id, log_update)
-
-                # Update agent activity timestamp
-                crud.update_agent_activity(db, result.get("agent_name", persona_name))
-
-                print(f"[SUCCESS] Task '{task_id}' completed in {duration_ms}ms")
-                print(f"  Mode:     {result.get('execution_mode', 'single_agent')}")
-                print(f"  Agent:    {result.get('agent_name', persona_name)}")
-                print(f"  SubTasks: {len(result.get('sub_task_results', []))}")
-                print(f"  Tokens:   {result.get('token_usage', 0)}")
-
-                # --- DELIVER CALLBACK TO OPENCLAW ---
-                if callback_url:
-                    deliver_callback(callback_url, task_id, result)
-
-                # --- STORE IN MEMORY (for conversation context) ---
-                if session_id:
-                    try:
-                        # Store user message
-                        crud.create_memory(db, schemas.MemoryCreate(
-                            agent_name=result.get("agent_name", persona_name),
-                            session_id=session_id,
-                            role="user",
-                            content=task_description,
-                        ))
-                        # Store agent response
-                        crud.create_memory(db, schemas.MemoryCreate(
-                            agent_name=result.get("agent_name", persona_name),
-                            session_id=session_id,
-                            role="agent",
-                            content=result.get("summary", result.get("final_answer", "")),
-                        ))
-                    except Exception as mem_err:
-                        print(f"[WARN] Failed to store memory: {mem_err}")
+        # Deliver failure callback to OpenClaw
+        if callback_url:
+            _callback_pool.submit(deliver_callback, callback_url, task_id, {
+                "status": "failure",
+                "summary": f"Task failed: {error_message}",
+                "agent_name": persona_name,
+            })
 
-            except Exception as e:
-                duration_ms = int((time.time() - start_time) * 1000)
-                error_message = str(e)
-
-                # --- EMIT: TASK_FAILED ---
-                emit_event("TASK_FAILED", {
-                    "task_id": task_id,
-                    "error": error_message,
-                })
-
-                log_update = schemas.TaskLogUpdate(
-                    status='failure',
-                    response_payload=json.dumps({"error": error_message}),
-                    duration_ms=duration_ms,
-                )
-                crud.update_task_log(db, task_id, log_update)
-                print(f"[FAILURE] Task '{task_id}' failed: {error_message}")
-
-                # Deliver failure callback to OpenClaw
-                if callback_url:
-                    deliver_callback(callback_url, task_id, {
-                        "status": "failure",
-                        "summary": f"Task failed: {error_message}",
-                        "agent_name": persona_name,
-                    })
+def ensure_consumer_group():
+    """Create the stream and group on first start; id '0' keeps anything already queued."""
+    try:
+        redis_conn.xgroup_create(TASK_STREAM, TASK_GROUP, id="0", mkstream=True)
+    except redis.exceptions.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+    # Jobs still sitting in the pre-stream 'task_queue' list from an older API
+    while True:
+        job_json = redis_conn.lpop("task_queue")
+        if job_json is None:
+            break
+        redis_conn.xadd(TASK_STREAM, {"p": job_json})
+
+def read_jobs(consumer: str, recovering: bool):
+    """
+    Next batch of (entry_id, fields) for `consumer`. While `recovering`, this
+    re-reads the entries it was handed before a restart but never acked; after
+    that it takes over long-abandoned entries, then blocks for new ones.
+    """
+    if recovering:
+        streams = redis_conn.xreadgroup(TASK_GROUP, consumer, {TASK_STREAM: "0"}, count=READ_COUNT)
+        return streams[0][1] if streams else []
+    res = redis_conn.xautoclaim(
+        TASK_STREAM, TASK_GROUP, consumer, min_idle_time=CLAIM_IDLE_MS, count=READ_COUNT,
+    )
+    # Redis < 7 replies without the third element (IDs of deleted pending entries)
+    claimed = res[1]
+    deleted = res[2] if len(res) > 2 else []
+    if claimed or deleted:
+        # Pending entries deleted from the stream come back as bare IDs
+        return claimed + [(entry_id, None) for entry_id in deleted]
+    streams = redis_conn.xreadgroup(
+        TASK_GROUP, consumer, {TASK_STREAM: ">"}, count=READ_COUNT, block=READ_BLOCK_MS,
+    )
+    return streams[0][1] if streams else []
+
+# Set by SIGTERM (docker stop) / SIGINT: the task in hand is finished and acked,
+# the rest of its batch stays pending for this consumer to re-read on restart
+_stop = threading.Event()
+
+def fail_lost_entry(db: Session, entry_id: str):
+    """A pending entry deleted from the stream before it ran: fail its task instead of leaving it QUEUED."""
+    task_id = redis_conn.hget(TASK_INFLIGHT, entry_id)
+    if not task_id:
+        log.error("Entry %s was deleted from '%s' before it ran; its task is unknown", entry_id, TASK_STREAM)
+        return
+    log.error("Entry %s for task '%s' was deleted from '%s' before it ran", entry_id, task_id, TASK_STREAM)
+    error_message = "Task was removed from the queue before it could run"
+    crud.update_task_log(db, task_id, schemas.TaskLogUpdate(
+        status='failure',
+        response_payload=orjson.dumps({"error": error_message}).decode(),
+    ))
+    emit_event("TASK_FAILED", {
+        "task_id": task_id,
+        "error": error_message,
+    })
+    publish_task_update(task_id, "failure", error=error_message)
+
+def ack(entry_id: str):
+    """
+    XACK and XDEL a handled entry, retrying through Redis hiccups: left pending,
+    the task would run again. Gives up only on shutdown, when the entry stays
+    pending for this consumer to pick up after the restart.
+    """
+    while True:
+        try:
+            with redis_conn.pipeline(transaction=False) as pipe:
+                pipe.xack(TASK_STREAM, TASK_GROUP, entry_id)
+                pipe.xdel(TASK_STREAM, entry_id)
+                pipe.hdel(TASK_INFLIGHT, entry_id)
+                pipe.execute()
+            return
+        except Exception as e:
+            log.error("Failed to ack entry %s in '%s': %s", entry_id, TASK_STREAM, e)
+            if _stop.is_set():
+                return
+            time.sleep(1)
 
+def main(consumer: str = WORKER_ID):
+    signal.signal(signal.SIGTERM, lambda *_: _stop.set())
+    signal.signal(signal.SIGINT, lambda *_: _stop.set())
+    try:
+        run(consumer)
+    finally:
+        # Callbacks emit events, so drain them before the event queue
+        _callback_pool.shutdown(wait=True)
+        _event_q.join()
+        _log_listener.stop()
+
+def run(consumer: str):
+    ensure_consumer_group()
+    recovering = True
+    while not _stop.is_set():
+        try:
+            entries = read_jobs(consumer, recovering)
         except Exception as e:
-            print(f"[ERROR] Unexpected error in worker loop: {e}")
+            log.error("Failed to read from '%s': %s", TASK_STREAM, e)
             time.sleep(1)
-        finally:
-            next(db_gen, None)
+            continue
+        if recovering and not entries:
+            recovering = False
+
+        jobs = []
+        for entry_id, fields in entries:
+            try:
+                jobs.append((entry_id, orjson.loads(fields["p"]) if fields else None))
+            except Exception as e:
+                log.error("Discarding unreadable entry %s from '%s': %s", entry_id, TASK_STREAM, e)
+                ack(entry_id)
+        inflight = {entry_id: job.get("task_id", "") for entry_id, job in jobs if job}
+        if inflight:
+            try:
+                redis_conn.hset(TASK_INFLIGHT, mapping=inflight)
+            except Exception as e:
+                log.warning("Failed to record in-flight entries: %s", e)
+
+        for entry_id, job in jobs:
+            if _stop.is_set():
+                break
+            db = SessionLocal()
+            try:
+                if job is None:
+                    fail_lost_entry(db, entry_id)
+                else:
+                    process_job(db, job)
+            except Exception as e:
+                log.exception("Unexpected error in worker loop: %s", e)
+                time.sleep(1)
+            finally:
+                db.close()
+            # Ack even on failure: the failure is already recorded on the task log
+            ack(entry_id)
+
+def serve():
+    """
+    Run WORKER_CONCURRENCY copies of main() in spawned processes, so a slow task
+    only holds up its own process. Each child re-imports this module and so gets
+    its own Redis pool and database engine. SIGTERM/SIGINT are passed on to the
+    children, which shut down as a single worker would.
+    """
+    if WORKER_CONCURRENCY == 1:
+        main()
+        return
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=main, args=(f"{WORKER_ID}-{i}",), name=f"worker-{i}")
+        for i in range(WORKER_CONCURRENCY)
+    ]
+    for proc in procs:
+        proc.start()
+    forward = lambda *_: [proc.terminate() for proc in procs]
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for proc in procs:
+        proc.join()
+    _log_listener.stop()
 
 if __name__ == "__main__":
-    main()
+    serve()